@@ -1,22 +1,172 @@
-from datetime import datetime, timedelta
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import date, datetime, time, timedelta
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, Depends, Request, Query
+from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
 
-from db import Session as DBSession, Exam
+import queries
+from compression import CachedBody, CompressionMiddleware, Compressor
+from cache import FragmentCache, ResponseCache, cache_key, http_date, is_not_modified, make_etag
+from db import (
+    Session as DBSession, current_data_generation, current_data_published_at, current_data_signature, engine,
+    init_db
+)
+from ics import calendar_feed
+from metrics import Metrics, MetricsMiddleware
+from query_profiler import QueryProfiler, QueryProfilerMiddleware
+from events import HEARTBEAT, RETRY_MS, Broadcaster, change_events, control_event
+from exports import EXPORT_FORMATS, export_chunks, negotiate_export_format
+from serialization import FORMATS, negotiate_format, parse_fields, serialize
+from calendar_index import build_calendar_index
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Prepare the database, templates and (with PREWARM_CACHES) the caches,
+    and run the background tasks while the app serves
+    """
+    # Databases published by older versions may predate newer tables
+    init_db()
+    compile_templates()
+    if PREWARM_CACHES:
+        # Before the index refresh task starts, which then finds it current
+        await prewarm_caches()
+    start_background_task(refresh_calendar_index())
+    start_background_task(watch_exam_changes())
+    try:
+        yield
+    finally:
+        for task in list(background_tasks):
+            task.cancel()
+        broadcaster.close()
+        db_executor.shutdown(wait=False)
+        export_executor.shutdown(wait=False)
 
 # Initialize FastAPI app
-app = FastAPI(title="Government Exam Calendar")
+app = FastAPI(title="Government Exam Calendar", lifespan=lifespan)
+
+# Compress responses for clients that accept gzip/brotli. Cached responses
+# are compressed once and kept in the response cache (see cached_response);
+# the middleware handles everything else.
+compressor = Compressor()
+app.add_middleware(CompressionMiddleware, compressor=compressor)
+
+# Count and time the SQL each request runs (see /api/debug/queries). With
+# QUERY_DEBUG_HEADER=1 every response carries a Server-Timing header with
+# its query count and SQL time
+query_profiler = QueryProfiler(debug_header=os.environ.get("QUERY_DEBUG_HEADER", "0") == "1")
+query_profiler.install(engine)
+app.add_middleware(QueryProfilerMiddleware, profiler=query_profiler)
+
+# Per-route request counts, latency and response sizes, served at /metrics.
+# Added last so it is outermost: latencies include compression and sizes are
+# what was sent. METRICS_MODE=light is cheaper on streamed responses (see
+# metrics.py); off stops recording
+metrics = Metrics(os.environ.get("METRICS_MODE", "full"))
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialize templates
-templates = Jinja2Templates(directory="templates")
+# Initialize templates. Compiled templates are also cached as bytecode on
+# disk, so a restarted server loads them without parsing the source again.
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader("templates"),
+    autoescape=True,
+    bytecode_cache=FileSystemBytecodeCache()
+))
+
+# Parts of the main page that only change with the data (or the day), each
+# rendered from templates/fragments/<name>.html and cached per body filter
+INDEX_FRAGMENTS = ("hero_stats", "body_options", "stats", "clash_weeks", "upcoming")
+FRAGMENT_CACHE_SIZE = 256
+fragment_cache = FragmentCache(maxsize=FRAGMENT_CACHE_SIZE)
+
+# Largest page the change feed returns in one response
+MAX_CHANGES_PAGE_SIZE = 1000
+
+# Widest window /api/exams/range serves in one response (a year plus the
+# leading/trailing weeks of a month grid)
+MAX_RANGE_DAYS = 400
+
+# Most exam IDs /api/exams/clashes accepts in one request
+MAX_CLASH_IDS = 500
+
+# Page sizes for exam lists (search, all exams); clients follow next_cursor
+DEFAULT_EXAMS_PAGE_SIZE = 100
+MAX_EXAMS_PAGE_SIZE = 500
+
+# Dedicated worker threads for blocking SQLite work, so a slow query never
+# stalls the event loop (and every other request) while it runs.
+DB_POOL_SIZE = 8
+db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+# Exports hold a thread for as long as the client keeps reading, so they get
+# their own (small) pool instead of tying up the query threads. Up to
+# EXPORT_QUEUE_SIZE encoded chunks wait for a slow client before the export
+# thread pauses.
+EXPORT_POOL_SIZE = 2
+EXPORT_QUEUE_SIZE = 4
+EXPORT_BATCH_SIZE = 2000
+export_executor = ThreadPoolExecutor(max_workers=EXPORT_POOL_SIZE, thread_name_prefix="export")
+
+# Rendered responses for the read endpoints. Entries are tagged with the data
+# generation they were built from, so publishing an ingest run invalidates
+# them; the TTL bounds how long time-relative results ("upcoming") can lag.
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL = 60
+response_cache = ResponseCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+# Browsers may reuse a response this long without asking; after that they
+# revalidate with If-None-Match / If-Modified-Since and usually get a 304.
+CACHE_CONTROL = f"public, max-age={RESPONSE_CACHE_TTL}"
+
+# ICS feeds depend only on the data, so they never expire by age: each is
+# built once per data generation (the old one is served while a new
+# generation's is built) and kept encoded, with an ETag that only changes
+# with the data
+FEED_CACHE_SIZE = 64
+feed_cache = ResponseCache(maxsize=FEED_CACHE_SIZE, ttl=float("inf"))
+
+# In-memory calendar index for the current data generation (None until the
+# first build). A background task rebuilds it when a new generation is
+# published; until then requests fall back to SQL.
+CALENDAR_INDEX_POLL_SECONDS = 5
+calendar_index = None
+background_tasks = set()
+
+# Set by serve.py, which builds the index once before forking its workers
+# so they all share that copy; workers then never build their own
+calendar_index_shared = False
+
+# With PREWARM_CACHES=1 the calendar index and the unfiltered main page are
+# built during startup, so the server only reports ready (and takes traffic
+# from an autoscaler) once its first requests will be fast
+PREWARM_CACHES = os.environ.get("PREWARM_CACHES", "0") == "1"
+
+# Event stream: how often the live database is checked for new changes, how
+# often idle streams get a keepalive, how many changes go in one published
+# message, and how many missed changes a reconnecting client may replay
+# before it is told to resync instead
+EVENT_POLL_SECONDS = 1
+EVENT_HEARTBEAT_SECONDS = 15
+EVENT_PAGE_SIZE = 500
+EVENT_REPLAY_LIMIT = 1000
+broadcaster = Broadcaster()
 
 # Pydantic models for data validation
 class ExamBase(BaseModel):
@@ -31,221 +181,603 @@ class ExamBase(BaseModel):
     class Config:
         from_attributes = True
 
-# Database session dependency
-def get_db():
-    db = DBSession()
+async def run_db(query, *args, **kwargs):
+    """Run query(session, *args, **kwargs) on the database thread pool"""
+    def call():
+        db = DBSession()
+        try:
+            return query(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    # A copy of the request's context, so its queries are counted against it
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, context.run, call)
+
+async def stream_db(produce, *args):
+    """
+    Yield the byte chunks of produce(session, *args), a generator run on
+    one export thread with its own session from start to finish. Stops
+    the export when the client goes away.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue(maxsize=EXPORT_QUEUE_SIZE)
+    stopped = threading.Event()
+    done = object()
+
+    def put(item):
+        future = asyncio.run_coroutine_threadsafe(chunks.put(item), loop)
+        while not stopped.is_set():
+            try:
+                return future.result(timeout=1)
+            except FutureTimeoutError:
+                # Queue still full: keep waiting unless the client went away
+                pass
+        future.cancel()
+
+    def run():
+        db = DBSession()
+        try:
+            for chunk in produce(db, *args):
+                if stopped.is_set():
+                    return
+                put(chunk)
+            put(done)
+        except Exception as e:
+            logger.error(f"Export failed: {str(e)}")
+            if not stopped.is_set():
+                put(e)
+        finally:
+            db.close()
+
+    loop.run_in_executor(export_executor, contextvars.copy_context().run, run)
     try:
-        yield db
+        while True:
+            chunk = await chunks.get()
+            if chunk is done:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
     finally:
-        db.close()
+        # Unblock a producer waiting on a full queue so it sees the flag
+        stopped.set()
+        while not chunks.empty():
+            chunks.get_nowait()
+
+def response_validators(key, generation):
+    """ETag and Last-Modified for a response built now from `generation`"""
+    today = date.today()
+    start_of_day = datetime.combine(today, time.min)
+    published_at = current_data_published_at()
+    last_modified = max(published_at, start_of_day) if published_at else start_of_day
+    return make_etag(key, generation, today.isoformat()), last_modified
+
+def feed_validators(key, generation):
+    """ETag and Last-Modified for a response that only changes with the data"""
+    return make_etag(key, generation, None), current_data_published_at()
+
+def validator_headers(etag, last_modified):
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept, Accept-Encoding"
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+async def cached_response(
+    request, route, params, render, media_type,
+    cache=response_cache, validators=response_validators
+):
+    """
+    Serve route+params through the response cache, answering conditional
+    requests for the current data with 304 before any work is done.
+    `await render()` builds the body on a miss.
+    """
+    key = cache_key(route, params)
+    generation = current_data_generation()
+    etag, last_modified = validators(key, generation)
+    if is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+    async def build():
+        # Validators travel with the body, so a stale body served during a
+        # refresh keeps the validators of the data it was built from
+        return CachedBody(await render()), validators(key, generation)
+
+    body, (etag, last_modified) = await cache.get_or_compute(key, generation, build)
+    headers = validator_headers(etag, last_modified)
+    content, encoding = compressor.encode_cached(body, compressor.negotiate(request.headers.get("accept-encoding")))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=media_type, headers=headers)
+
+def current_calendar_index():
+    """The calendar index, if it was built from the live data generation"""
+    index = calendar_index
+    if index is not None and index.generation == current_data_generation():
+        return index
+    return None
+
+async def index_fragments(conducting_body):
+    """The main page's rendered fragments for a body filter"""
+    version = (current_data_generation(), date.today())
+    key = conducting_body or None
+    fragments = fragment_cache.get(version, key)
+    if fragments is None:
+        index = current_calendar_index()
+        if index is not None:
+            context = index.index_page_data(conducting_body)
+        else:
+            context = await run_db(queries.index_page_data, conducting_body)
+        fragments = {
+            name: Markup(templates.get_template(f"fragments/{name}.html").render(context))
+            for name in INDEX_FRAGMENTS
+        }
+        fragment_cache.store(version, key, fragments)
+    return fragments
+
+async def refresh_calendar_index():
+    """Rebuild the calendar index off the request path whenever the data generation changes"""
+    global calendar_index
+    if calendar_index_shared:
+        # The supervisor replaces this worker when a new generation is published
+        return
+    while True:
+        try:
+            if current_calendar_index() is None:
+                calendar_index = await run_db(build_calendar_index)
+        except Exception as e:
+            logger.error(f"Error building calendar index: {str(e)}")
+        await asyncio.sleep(CALENDAR_INDEX_POLL_SECONDS)
+
+async def watch_exam_changes():
+    """Publish change-log entries to event-stream clients as ingestion commits them"""
+    loop = asyncio.get_running_loop()
+    signature = last_seq = None
+    next_heartbeat = loop.time() + EVENT_HEARTBEAT_SECONDS
+    while True:
+        try:
+            # Every commit (and every published generation) changes the live file
+            current = current_data_signature()
+            if current != signature:
+                latest = await run_db(queries.latest_change_seq)
+                if last_seq is not None and latest < last_seq:
+                    # An older generation was swapped back in
+                    broadcaster.publish(control_event("resync", {"generation": current_data_generation()}))
+                    last_seq = latest
+                elif last_seq is None:
+                    last_seq = latest
+                while last_seq < latest:
+                    page = await run_db(queries.exam_changes_page, last_seq, EVENT_PAGE_SIZE)
+                    if not page["changes"]:
+                        break
+                    broadcaster.publish_changes(page["changes"])
+                    last_seq = page["next_cursor"]
+                signature = current
+
+            if loop.time() >= next_heartbeat:
+                broadcaster.publish(HEARTBEAT)
+                next_heartbeat = loop.time() + EVENT_HEARTBEAT_SECONDS
+        except Exception as e:
+            logger.error(f"Error publishing exam changes: {str(e)}")
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+
+async def cached_data(
+    request, route, params, query, *args,
+    fields=None, format=None, from_index=None, json_from_index=None
+):
+    """
+    Serve query(session, *args) through the response cache, projected to
+    the requested ?fields= and encoded in the negotiated format.
+
+    While the calendar index is current, from_index(index) answers instead
+    of SQL with the same data, and json_from_index(index) with the
+    finished body of a plain JSON request.
+    """
+    response_format = negotiate_format(request.headers.get("accept"), format)
+    names = parse_fields(fields)
+
+    async def render():
+        index = current_calendar_index()
+        if index is not None:
+            if json_from_index is not None and response_format == "json" and not names:
+                return json_from_index(index)
+            if from_index is not None:
+                return serialize(from_index(index), response_format, names)
+        return serialize(await run_db(query, *args), response_format, names)
+
+    params = {**params, "fields": ",".join(names) if names else None, "format": response_format}
+    return await cached_response(request, route, params, render, FORMATS[response_format])
+
+def compile_templates():
+    # Load every template up front so the first page view doesn't parse any
+    names = templates.env.list_templates()
+    for name in names:
+        templates.get_template(name)
+    logger.info(f"Compiled {len(names)} templates")
+
+async def prewarm_caches():
+    global calendar_index
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    if current_calendar_index() is None:
+        calendar_index = await run_db(build_calendar_index)
+    await index_fragments(None)
+    logger.info(f"Prewarmed caches in {(loop.time() - started) * 1000:.0f} ms")
+
+def start_background_task(coroutine):
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(
     request: Request,
-    db: Session = Depends(get_db),
     conducting_body: Optional[str] = None,
     month: Optional[int] = None,
     year: Optional[int] = None
 ):
     """Render the main calendar page"""
     try:
-        # Get current month and year if not specified
-        now = datetime.now()
-        current_month = month or now.month
-        current_year = year or now.year
+        async def render():
+            fragments = await index_fragments(conducting_body)
+            return templates.get_template("index.html").render({"request": request, "fragments": fragments}).encode()
 
-        # Build date range for the selected month
-        start_date = datetime(current_year, current_month, 1)
-        if current_month == 12:
-            end_date = datetime(current_year + 1, 1, 1)
-        else:
-            end_date = datetime(current_year, current_month + 1, 1)
+        # The page doesn't depend on month/year, so every month shares one entry
+        params = {"conducting_body": conducting_body}
+        return await cached_response(request, "index", params, render, "text/html; charset=utf-8")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Query exams for the selected month and upcoming exams
-        month_query = db.query(Exam).filter(
-            Exam.exam_date >= start_date,
-            Exam.exam_date < end_date
-        )
+@app.get("/calendar/{feed}.ics")
+async def get_calendar_feed(request: Request, feed: str):
+    """
+    iCalendar feed of exam dates and application windows for one conducting
+    body (/calendar/UPSC.ics) or every body (/calendar/all.ics), for
+    subscribing from calendar apps
+    """
+    conducting_body = None if feed.lower() == "all" else feed.upper()
+    try:
+        async def render():
+            name = f"{conducting_body} Exams" if conducting_body else "Government Exams"
+            stamp = current_data_published_at() or datetime.now()
+            index = current_calendar_index()
+            if index is not None:
+                # Encoding a large feed takes a while, so it stays off the event loop too
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    db_executor, lambda: calendar_feed(index.feed_exams(conducting_body), name, stamp)
+                )
+            return await run_db(lambda db: calendar_feed(queries.feed_exams(db, conducting_body), name, stamp))
 
-        # Get upcoming exams (next 3 months)
-        upcoming_end_date = now + timedelta(days=90)
-        upcoming_query = db.query(Exam).filter(
-            Exam.exam_date >= now,
-            Exam.exam_date <= upcoming_end_date
-        ).order_by(Exam.exam_date)
-
-        # Apply conducting body filter if specified
-        if conducting_body:
-            month_query = month_query.filter(Exam.conducting_body == conducting_body)
-            upcoming_query = upcoming_query.filter(Exam.conducting_body == conducting_body)
-
-        month_exams = month_query.all()
-        upcoming_exams = upcoming_query.limit(20).all()  # Limit to 20 upcoming exams
-
-        # Get list of conducting bodies for the filter dropdown
-        conducting_bodies = [body[0] for body in db.query(Exam.conducting_body).distinct().all()]
-        conducting_bodies.sort()
-
-        # Get exam statistics
-        total_exams = db.query(Exam).count()
-        total_upcoming = db.query(Exam).filter(Exam.exam_date >= now).count()
-
-        # Get recent exams (for display)
-        recent_exams = db.query(Exam).order_by(Exam.created_at.desc()).limit(10).all()
-
-        return templates.TemplateResponse(
-            "index.html",
-            {
-                "request": request,
-                "exams": upcoming_exams,  # Use upcoming exams for the table
-                "month_exams": month_exams,  # Exams for current month
-                "conducting_bodies": conducting_bodies,
-                "selected_body": conducting_body,
-                "current_month": current_month,
-                "current_year": current_year,
-                "total_exams": total_exams,
-                "upcoming_exams": total_upcoming,
-                "recent_exams": recent_exams
-            }
+        return await cached_response(
+            request, "calendar_feed", {"conducting_body": conducting_body}, render,
+            "text/calendar; charset=utf-8", cache=feed_cache, validators=feed_validators
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/exams/month/{year}/{month}")
 async def get_month_exams(
+    request: Request,
     year: int,
     month: int,
     conducting_body: Optional[str] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    format: Optional[str] = None
 ):
     """Get exams for a specific month (AJAX endpoint for calendar updates)"""
     try:
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
+        params = {"year": year, "month": month, "conducting_body": conducting_body}
+        return await cached_data(
+            request, "month_exams", params, queries.month_exams, year, month, conducting_body,
+            fields=fields, format=format,
+            json_from_index=lambda index: index.month_json(year, month, conducting_body)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/exams/range")
+async def get_range_events(
+    request: Request,
+    start: date,
+    end: date,
+    body: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: Optional[str] = None
+):
+    """
+    Calendar events for exams dated in [start, end), optionally for one
+    conducting body. Serves exactly the calendar's visible window in one query.
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=MAX_RANGE_DAYS):
+        raise HTTPException(status_code=400, detail=f"Range must be at most {MAX_RANGE_DAYS} days")
 
-        query = db.query(Exam).filter(
-            Exam.exam_date >= start_date,
-            Exam.exam_date < end_date
+    try:
+        params = {"start": start, "end": end, "body": body}
+        start_at, end_at = datetime.combine(start, time.min), datetime.combine(end, time.min)
+        return await cached_data(
+            request, "range_events", params, queries.range_events, start_at, end_at, body,
+            fields=fields, format=format,
+            json_from_index=lambda index: index.range_json(start_at, end_at, body)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/exams/open")
+async def get_applications_by_status(
+    request: Request,
+    on: Optional[date] = None,
+    status: str = Query("open", pattern="^(open|upcoming|closed)$"),
+    conducting_body: Optional[str] = None,
+    limit: int = Query(DEFAULT_EXAMS_PAGE_SIZE, ge=1, le=MAX_EXAMS_PAGE_SIZE),
+    fields: Optional[str] = None,
+    format: Optional[str] = None
+):
+    """
+    Exams whose applications are open on a day (default today), or with
+    status=upcoming / closed, those not yet open / already closed
+    """
+    on = on or date.today()
+    try:
+        params = {"on": on, "status": status, "conducting_body": conducting_body, "limit": limit}
+        return await cached_data(
+            request, "applications", params, queries.applications_by_status, on, status, conducting_body, limit,
+            fields=fields, format=format,
+            from_index=lambda index: index.applications_by_status(on, status, conducting_body, limit)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/exams/closing-soon")
+async def get_applications_closing(
+    request: Request,
+    within: int = Query(7, ge=0, le=MAX_RANGE_DAYS),
+    on: Optional[date] = None,
+    status: Optional[str] = Query(None, pattern="^(open|upcoming)$"),
+    conducting_body: Optional[str] = None,
+    limit: int = Query(DEFAULT_EXAMS_PAGE_SIZE, ge=1, le=MAX_EXAMS_PAGE_SIZE),
+    fields: Optional[str] = None,
+    format: Optional[str] = None
+):
+    """
+    Exams whose application deadline is within `within` days of a day
+    (default today), soonest first; status=open keeps only those already open
+    """
+    on = on or date.today()
+    try:
+        params = {"within": within, "on": on, "status": status, "conducting_body": conducting_body, "limit": limit}
+        return await cached_data(
+            request, "closing_soon", params, queries.applications_closing, on, within, status, conducting_body, limit,
+            fields=fields, format=format,
+            from_index=lambda index: index.applications_closing(on, within, status, conducting_body, limit)
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if conducting_body:
-            query = query.filter(Exam.conducting_body == conducting_body)
-
-        exams = query.all()
-        return [
-            {
-                "id": exam.id,
-                "name": exam.exam_name,
-                "date": exam.exam_date.strftime("%Y-%m-%d"),
-                "body": exam.conducting_body,
-                "link": exam.official_link,
-                "app_start": exam.application_start.strftime("%Y-%m-%d") if exam.application_start else None,
-                "app_end": exam.application_end.strftime("%Y-%m-%d") if exam.application_end else None,
-                "app_start_formatted": exam.application_start.strftime("%d %b %Y") if exam.application_start else "Not Available",
-                "app_end_formatted": exam.application_end.strftime("%d %b %Y") if exam.application_end else "Not Available",
-                "exam_date_formatted": exam.exam_date.strftime("%d %b %Y") if exam.exam_date else "TBA"
-            }
-            for exam in exams
-        ]
+@app.get("/api/exams/clashes")
+async def get_exam_clashes(
+    request: Request,
+    ids: Optional[str] = None,
+    conducting_body: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    gap_days: int = Query(queries.DEFAULT_GAP_DAYS, ge=0, le=31),
+    limit: int = Query(DEFAULT_EXAMS_PAGE_SIZE, ge=1, le=MAX_EXAMS_PAGE_SIZE)
+):
+    """
+    Exams that fall on the same day, days with exams at most gap_days
+    apart, and the weeks with the most clashes. Checks a comma-separated
+    list of exam `ids`, or every exam (optionally of one body, dated in
+    [start, end)).
+    """
+    try:
+        exam_ids = sorted({int(exam_id) for exam_id in ids.split(',') if exam_id.strip()}) if ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if exam_ids and len(exam_ids) > MAX_CLASH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CLASH_IDS} ids can be checked at once")
+
+    start_at = datetime.combine(start, time.min) if start else None
+    end_at = datetime.combine(end, time.min) if end else None
+    try:
+        params = {
+            "ids": ",".join(map(str, exam_ids)) if exam_ids else None, "conducting_body": conducting_body,
+            "start": start, "end": end, "gap_days": gap_days, "limit": limit
+        }
+        return await cached_data(
+            request, "clashes", params, queries.exam_clashes,
+            exam_ids, conducting_body, start_at, end_at, gap_days, limit,
+            from_index=lambda index: index.exam_clashes(exam_ids, conducting_body, start_at, end_at, gap_days, limit)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/exams/search")
 async def search_exams(
+    request: Request,
     q: Optional[str] = None,
     conducting_body: Optional[str] = None,
     days: Optional[int] = 90,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_EXAMS_PAGE_SIZE, ge=1, le=MAX_EXAMS_PAGE_SIZE),
+    fields: Optional[str] = None,
+    format: Optional[str] = None
+):
+    """
+    Search exams with filters, one page at a time. Pass the returned
+    next_cursor as `cursor` until has_more is false.
+    """
+    try:
+        params = {"q": q, "conducting_body": conducting_body, "days": days, "cursor": cursor, "limit": limit}
+        return await cached_data(
+            request, "search_exams", params, queries.search_exams, q, conducting_body, days, cursor, limit,
+            fields=fields, format=format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/exports/exams")
+async def export_exams(
+    request: Request,
+    q: Optional[str] = None,
+    conducting_body: Optional[str] = None,
+    days: Optional[int] = None,
+    format: Optional[str] = None
 ):
-    """Search exams with filters"""
-    try:
-        query = db.query(Exam)
-        
-        # Apply date filter
-        if days:
-            end_date = datetime.now() + timedelta(days=days)
-            query = query.filter(
-                Exam.exam_date >= datetime.now(),
-                Exam.exam_date <= end_date
-            )
-        
-        # Apply conducting body filter
-        if conducting_body:
-            query = query.filter(Exam.conducting_body == conducting_body)
-        
-        # Apply text search
-        if q:
-            query = query.filter(Exam.exam_name.contains(q))
-        
-        exams = query.order_by(Exam.exam_date).all()
-        
-        return [
-            {
-                "id": exam.id,
-                "name": exam.exam_name,
-                "date": exam.exam_date.strftime("%Y-%m-%d"),
-                "body": exam.conducting_body,
-                "link": exam.official_link,
-                "app_start": exam.application_start.strftime("%Y-%m-%d") if exam.application_start else None,
-                "app_end": exam.application_end.strftime("%Y-%m-%d") if exam.application_end else None
-            }
-            for exam in exams
-        ]
+    """
+    Stream every exam matching the search filters (all exams by default),
+    ordered by date, as NDJSON, CSV or Parquet (?format= or the Accept
+    header). Memory use stays flat however many rows are exported.
+    """
+    try:
+        export_format = negotiate_export_format(request.headers.get("accept"), format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def produce(db):
+        batches = queries.export_batches(db, q, conducting_body, days, EXPORT_BATCH_SIZE)
+        return export_chunks(export_format, queries.EXPORT_FIELDS, batches)
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        stream_db(produce),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="exams.{extension}"'}
+    )
+
+@app.get("/api/events/stream")
+async def stream_events(request: Request, since: Optional[int] = Query(None, ge=0)):
+    """
+    Server-sent events for exam changes as ingestion commits them: one event
+    per change (event: insert, update or delete; id: its change-log seq;
+    data: the change as /api/exams/changes returns it). Reconnecting clients
+    resume after Last-Event-ID (or ?since=); one that missed too much gets a
+    `resync` event and should reload or delta-sync from /api/exams/changes.
+    """
+    try:
+        last_event_id = request.headers.get("last-event-id")
+        after = int(last_event_id) if last_event_id else since
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be a change seq")
+
+    # Subscribe before replaying, so nothing committed in between is missed
+    subscriber = broadcaster.subscribe()
+    try:
+        opening = b"retry: %d\n\n" % RETRY_MS
+        if after is not None:
+            page = await run_db(queries.exam_changes_page, after, EVENT_REPLAY_LIMIT)
+            if page["has_more"]:
+                opening += control_event("resync", {"generation": current_data_generation()})
+            else:
+                opening += change_events(page["changes"])
+                subscriber.after_seq = page["next_cursor"]
     except Exception as e:
+        broadcaster.unsubscribe(subscriber)
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def stream():
+        try:
+            yield opening
+            async for chunk in broadcaster.messages(subscriber):
+                yield chunk
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/stats")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(request: Request):
     """Get exam statistics"""
     try:
-        now = datetime.now()
-        
-        total_exams = db.query(Exam).count()
-        upcoming_exams = db.query(Exam).filter(Exam.exam_date >= now).count()
-        this_month_exams = db.query(Exam).filter(
-            Exam.exam_date >= datetime(now.year, now.month, 1),
-            Exam.exam_date < datetime(now.year, now.month + 1, 1) if now.month < 12 else datetime(now.year + 1, 1, 1)
-        ).count()
-        
-        # Get conducting body stats
-        body_stats = {}
-        for body in db.query(Exam.conducting_body).distinct().all():
-            count = db.query(Exam).filter(
-                Exam.conducting_body == body[0],
-                Exam.exam_date >= now
-            ).count()
-            body_stats[body[0]] = count
-        
-        return {
-            "total_exams": total_exams,
-            "upcoming_exams": upcoming_exams,
-            "this_month_exams": this_month_exams,
-            "body_stats": body_stats
-        }
+        return await cached_data(request, "stats", {}, queries.exam_stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/exams/changes")
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=MAX_CHANGES_PAGE_SIZE)
+):
+    """
+    Delta sync: changes after the `since` cursor, oldest first. Pass the
+    returned next_cursor as `since` until has_more is false.
+    """
+    try:
+        return await run_db(queries.exam_changes_page, since, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+async def get_metrics():
+    """Request metrics in the Prometheus text format"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/debug/calendar-index")
+async def get_calendar_index_stats():
+    """Size, memory use and generation of the in-memory calendar index"""
+    index = calendar_index
+    if index is None:
+        return {"ready": False}
+    return {"ready": True, "current": index is current_calendar_index(), **index.stats()}
+
+@app.get("/api/debug/compression")
+async def get_compression_stats():
+    """Responses compressed and bytes saved since startup"""
+    return compressor.stats()
+
+@app.get("/api/debug/events")
+async def get_event_stream_stats():
+    """Connected event-stream clients, messages published and slow clients dropped"""
+    return broadcaster.stats()
+
+@app.get("/api/debug/latency")
+async def get_latency_stats():
+    """p50/p95/p99 latency per route since startup, estimated from the /metrics histograms"""
+    return metrics.latency()
+
+@app.get("/api/debug/queries")
+async def get_query_stats():
+    """Statements with the most total SQL time since startup, and how many were slow"""
+    return query_profiler.stats()
+
 @app.get("/api/debug/all-exams")
-async def get_all_exams(db: Session = Depends(get_db)):
-    """Debug endpoint to see all exams in the database"""
-    try:
-        exams = db.query(Exam).order_by(Exam.exam_date).all()
-        return [
-            {
-                "id": exam.id,
-                "name": exam.exam_name,
-                "date": exam.exam_date.strftime("%Y-%m-%d"),
-                "body": exam.conducting_body,
-                "link": exam.official_link
-            }
-            for exam in exams
-        ]
+async def get_all_exams(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_EXAMS_PAGE_SIZE, ge=1, le=MAX_EXAMS_PAGE_SIZE)
+):
+    """Debug endpoint to page through all exams in the database"""
+    try:
+        page = await run_db(queries.all_exams, cursor, limit)
+        return Response(content=serialize(page), media_type=FORMATS["json"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Event streams never finish on their own, so don't wait on them forever at shutdown
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_graceful_shutdown=5) 
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from metrics import METRICS_MODES, Metrics, MetricsMiddleware
+
+# Measures what the metrics middleware itself costs per request in each mode,
+# against a bare ASGI app that answers immediately (so nothing hides the
+# overhead), and how long rendering /metrics takes once many routes have
+# been seen.
+
+class FakeRoute:
+    def __init__(self, path):
+        self.path = path
+
+def make_app(body, chunks):
+    async def app(scope, receive, send):
+        scope["route"] = FakeRoute("/api/exams/range")
+        await send({
+            "type": "http.response.start", "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body) * chunks).encode())]
+        })
+        for i in range(chunks):
+            await send({"type": "http.response.body", "body": body, "more_body": i < chunks - 1})
+    return app
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def time_requests(app, requests):
+    scope = {"type": "http", "method": "GET", "path": "/api/exams/range"}
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+def run_benchmark(requests, repeat, chunks):
+    bare = make_app(b"x" * 2048, chunks)
+    baseline = statistics.median(asyncio.run(time_requests(bare, requests)) for _ in range(repeat))
+    print(f"Bare app: {baseline * 1e6:.2f} µs/request ({chunks} body message{'s' if chunks > 1 else ''})")
+    for mode in METRICS_MODES:
+        app = MetricsMiddleware(bare, Metrics(mode))
+        cost = statistics.median(asyncio.run(time_requests(app, requests)) for _ in range(repeat))
+        print(f"  {mode:<6} +{(cost - baseline) * 1e6:6.2f} µs/request")
+
+    metrics = Metrics("full")
+    for i in range(50):
+        for status in (200, 304, 404):
+            metrics.record(f"/api/route/{i}", "GET", status, 0.003 * (i % 7), 4096 * (i % 5))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = metrics.render()
+    print(f"Render, 50 routes x 3 statuses: {(time.perf_counter() - started) / repeat * 1000:.2f} ms, {len(body)} bytes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the request metrics middleware")
+    parser.add_argument("--requests", type=int, default=50000, help="Requests per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode (median is reported)")
+    parser.add_argument("--chunks", type=int, default=1, help="Body messages per response (streamed responses send many)")
+    args = parser.parse_args()
+
+    run_benchmark(args.requests, args.repeat, args.chunks)
@@ -0,0 +1,95 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+import queries
+from db import Base, Exam, create_db_engine, create_search_index
+
+# Compares the full-text search path of /api/exams/search with the LIKE
+# '%q%' filter it replaced, on synthetic tables of increasing size.
+
+BODIES = ['UPSC', 'SSC', 'IBPS', 'SBI', 'RAILWAY', 'POLICE', 'TEACHING', 'DEFENCE', 'STATE_PSC', 'OTHER']
+WORDS = (
+    'Civil Services Preliminary Main Combined Graduate Level Higher Secondary Clerk '
+    'Officer Probationary Junior Engineer Constable Teacher Assistant Technician '
+    'Stenographer Recruitment Examination Grade Scientist Inspector Manager Nursing'
+).split()
+SEARCHES = ['Clerk', 'junior engineer', '"Probationary Officer"', 'Steno', '4242']
+
+def build_database(path, rows, batch_size=10000):
+    """Create a database at path holding `rows` random exams"""
+    engine = create_db_engine(path)
+    Base.metadata.create_all(engine)
+    create_search_index(engine)
+
+    rng = random.Random(rows)
+    base = datetime(2025, 1, 1)
+    with engine.begin() as connection:
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, rows)):
+                body = rng.choice(BODIES)
+                exam_date = base + timedelta(days=rng.randrange(0, 1500))
+                batch.append({
+                    'exam_name': f"{body} {' '.join(rng.sample(WORDS, 4))} {exam_date.year} #{i}",
+                    'conducting_body': body,
+                    'exam_date': exam_date,
+                    'source_url': f"https://example.com/{body.lower()}/{i}",
+                    'created_at': base,
+                    'updated_at': base
+                })
+            connection.execute(insert(Exam), batch)
+    return engine
+
+def like_search(db, q, days=90):
+    """The previous search path: an unranked LIKE '%q%' scan"""
+    query = db.query(Exam)
+    if days:
+        query = query.filter(Exam.exam_date >= datetime.now(), Exam.exam_date <= datetime.now() + timedelta(days=days))
+    return query.filter(Exam.exam_name.contains(q.strip('"'))).order_by(Exam.exam_date).all()
+
+def fts_search(db, q, days=90):
+    # One page large enough to hold every match, to compare like with like
+    return queries.search_exams(db, q, None, days, limit=10 ** 9)["exams"].rows
+
+def time_search(search, db, q, days, repeat):
+    """Median wall time in milliseconds of `repeat` runs, and the result size"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = search(db, q, days)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.expunge_all()
+    return statistics.median(timings), len(result)
+
+def run_benchmark(sizes, repeat=5, days=90):
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            engine = build_database(os.path.join(directory, 'bench.db'), rows)
+            print(f"\n{rows:,} rows (built in {time.perf_counter() - started:.1f}s), days={days}")
+            print(f"  {'query':<24}{'LIKE ms':>10}{'hits':>8}{'FTS ms':>10}{'hits':>8}")
+            db = sessionmaker(bind=engine)()
+            try:
+                for q in SEARCHES:
+                    like_ms, like_hits = time_search(like_search, db, q, days, repeat)
+                    fts_ms, fts_hits = time_search(fts_search, db, q, days, repeat)
+                    print(f"  {q:<24}{like_ms:>10.1f}{like_hits:>8}{fts_ms:>10.1f}{fts_hits:>8}")
+            finally:
+                db.close()
+                engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full-text search against LIKE")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000], help="Table sizes to test")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median is reported)")
+    parser.add_argument("--days", type=int, default=90, help="Upcoming window in days (0 searches everything)")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.repeat, args.days)
@@ -0,0 +1,92 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+from starlette.responses import JSONResponse
+
+import queries
+from db import Base, Exam, create_db_engine
+from serialization import serialize
+
+# Times a large /exams/month response (query + serialization) through the
+# previous ORM/strftime/json path and the Rows + orjson/msgpack path.
+
+def build_database(path, rows):
+    """Create a database at path with `rows` exams, all in June 2026"""
+    engine = create_db_engine(path)
+    Base.metadata.create_all(engine)
+    base = datetime(2026, 6, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(Exam), [
+            {
+                'exam_name': f"Combined Graduate Level Examination Tier {i % 4 + 1} Shift #{i}",
+                'conducting_body': ('SSC', 'UPSC', 'IBPS', 'RAILWAY')[i % 4],
+                'exam_date': base + timedelta(days=i % 30),
+                'application_start': base - timedelta(days=60 + i % 10),
+                'application_end': base - timedelta(days=30 + i % 10),
+                'official_link': f"https://example.gov.in/notice/{i}",
+                'created_at': base,
+                'updated_at': base
+            }
+            for i in range(rows)
+        ])
+    return engine
+
+def previous_month_exams(db, year, month):
+    """The path this replaced: ORM objects, strftime per field, dict per row"""
+    start_date, end_date = queries.month_bounds(year, month)
+    exams = db.query(Exam).filter(Exam.exam_date >= start_date, Exam.exam_date < end_date).all()
+    data = [
+        {
+            "id": exam.id,
+            "name": exam.exam_name,
+            "date": exam.exam_date.strftime("%Y-%m-%d"),
+            "body": exam.conducting_body,
+            "link": exam.official_link,
+            "app_start": exam.application_start.strftime("%Y-%m-%d") if exam.application_start else None,
+            "app_end": exam.application_end.strftime("%Y-%m-%d") if exam.application_end else None,
+            "app_start_formatted": exam.application_start.strftime("%d %b %Y") if exam.application_start else "Not Available",
+            "app_end_formatted": exam.application_end.strftime("%d %b %Y") if exam.application_end else "Not Available",
+            "exam_date_formatted": exam.exam_date.strftime("%d %b %Y") if exam.exam_date else "TBA"
+        }
+        for exam in exams
+    ]
+    return JSONResponse(data).body
+
+def run_benchmark(rows, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_database(os.path.join(directory, 'bench.db'), rows)
+        db = sessionmaker(bind=engine)()
+        cases = [
+            ("previous (ORM + json)", lambda: previous_month_exams(db, 2026, 6)),
+            ("json (orjson)", lambda: serialize(queries.month_exams(db, 2026, 6), "json")),
+            ("json ?fields=id,name,date", lambda: serialize(queries.month_exams(db, 2026, 6), "json", ["id", "name", "date"])),
+            ("columns", lambda: serialize(queries.month_exams(db, 2026, 6), "columns")),
+            ("msgpack", lambda: serialize(queries.month_exams(db, 2026, 6), "msgpack")),
+        ]
+        print(f"{rows:,}-row month response, median of {repeat}")
+        print(f"  {'path':<28}{'ms':>9}{'bytes':>11}")
+        try:
+            for name, build in cases:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    body = build()
+                    timings.append((time.perf_counter() - start) * 1000)
+                    db.expunge_all()
+                print(f"  {name:<28}{statistics.median(timings):>9.1f}{len(body):>11,}")
+        finally:
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization for large month views")
+    parser.add_argument("--rows", type=int, default=10000, help="Exams in the benchmarked month")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per path (median is reported)")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.repeat)
@@ -0,0 +1,101 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+# Cold-start profile: where import time goes (python -X importtime) for the
+# API and the scraper CLI, and how long a fresh server takes to answer its
+# first requests with and without PREWARM_CACHES. Run it from the server's
+# directory (it uses that directory's exams.db).
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENV = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+
+def import_profile(statement):
+    """[(module, µs spent in the module itself)] for everything statement imports"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=ENV, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us)))
+    return modules
+
+def report_imports(label, statement, top):
+    modules = import_profile(statement)
+    total = sum(self_us for _, self_us in modules)
+    by_package = defaultdict(int)
+    for name, self_us in modules:
+        by_package[name.split(".")[0]] += self_us
+    print(f"\n{label}: {total / 1000:.0f} ms importing {len(modules)} modules")
+    print("  By top-level package:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {package:<28} {self_us / 1000:7.1f} ms")
+    print("  Slowest modules (own time):")
+    for name, self_us in sorted(modules, key=lambda module: -module[1])[:top]:
+        print(f"    {name:<40} {self_us / 1000:7.1f} ms")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get(url):
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=60) as response:
+        response.read()
+    return time.perf_counter() - started
+
+def report_server(prewarm):
+    """Start a server, wait until it answers, then time the first page and range requests"""
+    port = free_port()
+    env = {**ENV, "PREWARM_CACHES": "1" if prewarm else "0"}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            try:
+                get(f"{base}/api/debug/compression")
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("Server exited during startup")
+                time.sleep(0.02)
+        ready = time.perf_counter() - started
+        page = get(f"{base}/")
+        month = get(f"{base}/api/exams/range?start=2026-06-01&end=2026-07-01")
+    finally:
+        server.terminate()
+        server.wait()
+    label = "with prewarm" if prewarm else "without prewarm"
+    print(f"  {label:<16} ready {ready * 1000:6.0f} ms   first page {page * 1000:6.1f} ms   "
+          f"first range {month * 1000:6.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile imports and cold start")
+    parser.add_argument("--top", type=int, default=10, help="Rows in each import table")
+    parser.add_argument("--no-server", action="store_true", help="Only profile imports")
+    args = parser.parse_args()
+
+    report_imports("import app", "import app", args.top)
+    scraper_cli = os.path.join(ROOT, "scraper.py")
+    report_imports("scraper CLI", f"import runpy, sys; sys.argv = [{scraper_cli!r}, '--help']\n"
+                   f"try: runpy.run_path({scraper_cli!r}, run_name='__main__')\nexcept SystemExit: pass", args.top)
+    report_imports("one scraper source", "import scraper.sarkari_result", args.top)
+
+    if not args.no_server:
+        print("\nCold start (against exams.db):")
+        report_server(prewarm=False)
+        report_server(prewarm=True)
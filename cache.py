@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def cache_key(route, params):
+    """Build a cache key from a route name and its query parameters, ignoring unset ones"""
+    normalized = tuple(sorted(
+        (name, str(value)) for name, value in params.items()
+        if value is not None and value != ''
+    ))
+    return (route, normalized)
+
+def make_etag(key, generation, day):
+    """
+    Weak ETag for a response built from data generation `generation` on
+    `day` (time-relative results such as "upcoming" change at midnight).
+    Weak, because compressed and uncompressed bodies share it.
+    """
+    digest = hashlib.sha1(repr((key, day)).encode('utf-8')).hexdigest()[:16]
+    return f'W/"{generation}-{digest}"'
+
+def http_date(value):
+    """Format a naive local datetime as an HTTP date"""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def is_not_modified(headers, etag, last_modified):
+    """
+    Decide whether a conditional GET can be answered with 304. If-None-Match
+    wins over If-Modified-Since when both are sent (RFC 9110 13.2.2).
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison: W/"x" and "x" match
+        wanted = etag[2:] if etag.startswith('W/') else etag
+        candidates = (tag.strip() for tag in if_none_match.split(','))
+        return any((tag[2:] if tag.startswith('W/') else tag) == wanted for tag in candidates)
+
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+        return modified <= since
+    return False
+
+class CacheEntry:
+    __slots__ = ('value', 'generation', 'stored_at')
+
+    def __init__(self, value, generation):
+        self.value = value
+        self.generation = generation
+        self.stored_at = time.monotonic()
+
+class ResponseCache:
+    """
+    In-process LRU cache of computed responses, keyed by route/parameters
+    and tagged with the data generation they were computed from.
+
+    - A fresh entry (same generation, younger than ttl) is returned as is.
+    - A stale entry is still returned immediately while one background task
+      recomputes it (stale-while-revalidate).
+    - Concurrent misses for the same key share a single computation
+      (single-flight) instead of each querying the database.
+    """
+
+    def __init__(self, maxsize=512, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def is_fresh(self, entry, generation):
+        return entry.generation == generation and time.monotonic() - entry.stored_at < self.ttl
+
+    async def get_or_compute(self, key, generation, compute):
+        """Return the cached value for key, computing it with `await compute()` if needed"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            if self.is_fresh(entry, generation):
+                self.hits += 1
+                return entry.value
+
+            self.stale_hits += 1
+            if key not in self.in_flight:
+                self._start(key, generation, compute, background=True)
+            return entry.value
+
+        self.misses += 1
+        future = self.in_flight.get(key)
+        if future is None:
+            future = self._start(key, generation, compute)
+        return await asyncio.shield(future)
+
+    def _start(self, key, generation, compute, background=False):
+        """Begin computing key; the returned future is shared by every waiter"""
+        future = asyncio.ensure_future(self._compute(key, generation, compute, background))
+        self.in_flight[key] = future
+        return future
+
+    async def _compute(self, key, generation, compute, background):
+        try:
+            value = await compute()
+            self.store(key, generation, value)
+            return value
+        except Exception as e:
+            if not background:
+                raise
+            # Keep serving the stale entry; the next request retries
+            logger.error(f"Background refresh of {key} failed: {str(e)}")
+        finally:
+            self.in_flight.pop(key, None)
+
+    def store(self, key, generation, value):
+        self.entries[key] = CacheEntry(value, generation)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "in_flight": len(self.in_flight)
+        }
+
+class FragmentCache:
+    """
+    Rendered page fragments keyed by filter, valid for one data generation
+    and one day (upcoming lists and counts move at midnight). Every entry
+    shares that version, so seeing a new one drops them all at once.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, version):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, version, key):
+        """The fragments stored for key at this version, or None"""
+        self._check_version(version)
+        fragments = self.entries.get(key)
+        if fragments is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fragments
+
+    def store(self, version, key, fragments):
+        if version != self.version:
+            # Rendered from data that has since been replaced
+            return
+        self.entries[key] = fragments
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
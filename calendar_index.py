@@ -0,0 +1,319 @@
+import logging
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+import orjson
+
+from db import Exam, get_data_generation
+from clashes import DEFAULT_GAP_DAYS, clash_report, heavy_weeks, sweep
+from intervals import IntervalTree
+from queries import APPLICATION_FIELDS, MONTH_EXAM_FIELDS, RANGE_EVENT_FIELDS, display_date, month_bounds
+from serialization import Rows
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# The exam attributes the index page template reads
+ExamRecord = namedtuple('ExamRecord', [
+    'id', 'exam_name', 'conducting_body', 'exam_date',
+    'application_start', 'application_end', 'official_link', 'source_url'
+])
+
+# How many upcoming exams the index page lists
+UPCOMING_LIMIT = 20
+
+def month_event(record):
+    """A record in the /exams/month event format, as a tuple of MONTH_EXAM_FIELDS"""
+    exam_date = record.exam_date.date().isoformat()
+    app_start = record.application_start.date().isoformat() if record.application_start else None
+    app_end = record.application_end.date().isoformat() if record.application_end else None
+    return (
+        record.id, record.exam_name, exam_date, record.conducting_body, record.official_link,
+        app_start, app_end,
+        display_date(app_start, "Not Available"),
+        display_date(app_end, "Not Available"),
+        display_date(exam_date, "TBA")
+    )
+
+class DatedExams:
+    """
+    Dated exams (of one body, or of all bodies) sorted by (exam_date, id),
+    with each exam's JSON payload for the month and range endpoints
+    serialized once up front. Any date window is two bisects and a join.
+    """
+    __slots__ = ('dates', 'records', 'month_payloads', 'range_payloads')
+
+    def __init__(self):
+        self.dates = []
+        self.records = []
+        self.month_payloads = []
+        self.range_payloads = []
+
+    def add(self, record, month_payload, range_payload):
+        self.dates.append(record.exam_date)
+        self.records.append(record)
+        self.month_payloads.append(month_payload)
+        self.range_payloads.append(range_payload)
+
+    def window(self, start, end):
+        """Slice bounds of exams dated in [start, end)"""
+        return bisect_left(self.dates, start), bisect_left(self.dates, end)
+
+    def count_from(self, start):
+        return len(self.dates) - bisect_left(self.dates, start)
+
+def application_row(record):
+    """A record as a tuple of APPLICATION_FIELDS"""
+    return (
+        record.id, record.exam_name,
+        record.exam_date.date().isoformat() if record.exam_date else None,
+        record.conducting_body, record.official_link,
+        record.application_start.date().isoformat(), record.application_end.date().isoformat()
+    )
+
+class ApplicationWindows:
+    """
+    Application windows [application_start, application_end] (by day) of a
+    set of exams: an interval tree for "open on day X" plus the windows
+    sorted by opening and by deadline for everything else. Each query is
+    a tree walk or a bisect, then only touches the rows it returns.
+    """
+    __slots__ = ('tree', 'starts', 'by_start', 'ends', 'by_end')
+
+    def __init__(self, records):
+        windows = [
+            (record.application_start.date(), record.application_end.date(), record)
+            for record in records
+        ]
+        self.tree = IntervalTree(window for window in windows if window[0] <= window[1])
+        by_start = sorted(windows, key=lambda window: (window[0], window[2].id))
+        by_end = sorted(windows, key=lambda window: (window[1], window[2].id))
+        self.starts = [window[0] for window in by_start]
+        self.by_start = [window[2] for window in by_start]
+        self.ends = [window[1] for window in by_end]
+        self.by_end = [window[2] for window in by_end]
+
+    def by_status(self, on, status, limit):
+        """
+        (first `limit` records, total) for exams open / upcoming / closed on
+        a day, in the same order as the SQL query
+        """
+        if status == "open":
+            found = self.tree.stab(on)
+            found.sort(key=lambda record: (record.application_end.date(), record.id))
+            return found[:limit], len(found)
+        if status == "upcoming":
+            lo = bisect_right(self.starts, on)
+            return self.by_start[lo:lo + limit], len(self.starts) - lo
+        # Closed: latest deadline first
+        hi = bisect_left(self.ends, on)
+        return self.by_end[max(hi - limit, 0):hi][::-1], hi
+
+    def closing(self, on, until):
+        """Records whose deadline is in [on, until], soonest first"""
+        return self.by_end[bisect_left(self.ends, on):bisect_right(self.ends, until)]
+
+    def memory_usage(self):
+        lists = (self.starts, self.by_start, self.ends, self.by_end)
+        total = sum(sys.getsizeof(items) for items in lists)
+        total += sum(sys.getsizeof(day) for day in self.starts) + sum(sys.getsizeof(day) for day in self.ends)
+        return total + self.tree.memory_usage()
+
+def clash_tuples(records):
+    """Records as the (id, name, body, day) tuples clashes.sweep() takes"""
+    return [(record.id, record.exam_name, record.conducting_body, record.exam_date.date()) for record in records]
+
+class CalendarIndex:
+    """
+    Read-only, in-memory view of one data generation that answers the
+    calendar's month and range requests and the index page without SQL.
+    Built once per generation and swapped in whole, so readers never see
+    it half-updated.
+    """
+
+    def __init__(self, generation, records):
+        self.generation = generation
+        self.built_at = datetime.now()
+        self.all = DatedExams()
+        self.by_body = defaultdict(DatedExams)
+        self.undated = defaultdict(int)
+
+        dated = []
+        for record in records:
+            if record.exam_date is None:
+                self.undated[record.conducting_body] += 1
+            else:
+                dated.append(record)
+        dated.sort(key=lambda record: (record.exam_date, record.id))
+
+        for record in dated:
+            event = month_event(record)
+            month_payload = orjson.dumps(dict(zip(MONTH_EXAM_FIELDS, event)))
+            range_payload = orjson.dumps(dict(zip(RANGE_EVENT_FIELDS, event[:len(RANGE_EVENT_FIELDS)])))
+            self.all.add(record, month_payload, range_payload)
+            self.by_body[record.conducting_body].add(record, month_payload, range_payload)
+        self.by_body = dict(self.by_body)
+        self.undated = dict(self.undated)
+        self.by_id = {record.id: record for record in dated}
+        self.undated_records = [record for record in records if record.exam_date is None]
+
+        # Per-week clash counts for the calendar page, overall and per body
+        self.clash_weeks = {
+            body: sweep(clash_tuples(exams.records))[2]
+            for body, exams in [(None, self.all), *self.by_body.items()]
+        }
+
+        self.exam_count = len(records)
+
+        with_windows = defaultdict(list)
+        for record in records:
+            if record.application_start is not None and record.application_end is not None:
+                with_windows[None].append(record)
+                with_windows[record.conducting_body].append(record)
+        self.applications = {body: ApplicationWindows(body_records) for body, body_records in with_windows.items()}
+
+    @classmethod
+    def build(cls, db):
+        """Load every exam from an open session into a new index"""
+        # Same session, same read transaction: the rows match the generation
+        generation = get_data_generation(db)
+        rows = db.query(
+            Exam.id, Exam.exam_name, Exam.conducting_body, Exam.exam_date,
+            Exam.application_start, Exam.application_end, Exam.official_link,
+            Exam.source_url
+        )
+        return cls(generation, [ExamRecord(*row) for row in rows])
+
+    def exams_for(self, conducting_body=None):
+        if conducting_body:
+            return self.by_body.get(conducting_body) or DatedExams()
+        return self.all
+
+    def range_json(self, start, end, conducting_body=None):
+        """/api/exams/range body for exams dated in [start, end)"""
+        exams = self.exams_for(conducting_body)
+        lo, hi = exams.window(start, end)
+        return b'[' + b','.join(exams.range_payloads[lo:hi]) + b']'
+
+    def month_json(self, year, month, conducting_body=None):
+        """/exams/month body for one calendar month"""
+        exams = self.exams_for(conducting_body)
+        lo, hi = exams.window(*month_bounds(year, month))
+        return b'[' + b','.join(exams.month_payloads[lo:hi]) + b']'
+
+    def windows_for(self, conducting_body=None):
+        return self.applications.get(conducting_body or None) or ApplicationWindows([])
+
+    def applications_by_status(self, on, status="open", conducting_body=None, limit=100):
+        """Same result as queries.applications_by_status, from memory"""
+        records, total = self.windows_for(conducting_body).by_status(on, status, limit)
+        rows = [application_row(record) for record in records]
+        return {"exams": Rows(APPLICATION_FIELDS, rows), "total": total}
+
+    def applications_closing(self, on, within=7, status=None, conducting_body=None, limit=100):
+        """Same result as queries.applications_closing, from memory"""
+        records = self.windows_for(conducting_body).closing(on, on + timedelta(days=within))
+        if status == "open":
+            records = [record for record in records if record.application_start.date() <= on]
+        elif status == "upcoming":
+            records = [record for record in records if record.application_start.date() > on]
+        rows = [application_row(record) for record in records[:limit]]
+        return {"exams": Rows(APPLICATION_FIELDS, rows), "total": len(records)}
+
+    def exam_clashes(self, ids=None, conducting_body=None, start=None, end=None, gap_days=DEFAULT_GAP_DAYS, limit=100):
+        """Same result as queries.exam_clashes, from memory"""
+        if ids:
+            records = sorted(
+                (self.by_id[exam_id] for exam_id in set(ids) if exam_id in self.by_id),
+                key=lambda record: (record.exam_date, record.id)
+            )
+            records = [
+                record for record in records
+                if (not conducting_body or record.conducting_body == conducting_body)
+                and (start is None or record.exam_date >= start)
+                and (end is None or record.exam_date < end)
+            ]
+        else:
+            exams = self.exams_for(conducting_body)
+            lo = bisect_left(exams.dates, start) if start else 0
+            hi = bisect_left(exams.dates, end) if end else len(exams.dates)
+            records = exams.records[lo:hi]
+        return clash_report(clash_tuples(records), gap_days, limit)
+
+    def index_page_data(self, conducting_body=None):
+        """Same context as queries.index_page_data, from memory"""
+        now = datetime.now()
+        exams = self.exams_for(conducting_body)
+
+        # Upcoming: dated from now up to and including 90 days ahead
+        lo = bisect_left(exams.dates, now)
+        upcoming = exams.records[lo:lo + UPCOMING_LIMIT]
+        upcoming_end = now + timedelta(days=90)
+        upcoming = [record for record in upcoming if record.exam_date <= upcoming_end]
+
+        # Counts match body_counts(): exams are dated at midnight, so
+        # "upcoming" starts tomorrow
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        bodies = set(self.by_body) | set(self.undated)
+        total_exams = self.exam_count
+        total_upcoming = self.all.count_from(tomorrow)
+
+        return {
+            "exams": upcoming,
+            "conducting_bodies": sorted(bodies),
+            "selected_body": conducting_body,
+            "total_exams": total_exams,
+            "upcoming_exams": total_upcoming,
+            "clash_weeks": heavy_weeks(self.clash_weeks.get(conducting_body or None, {}), since=now.date())
+        }
+
+    def feed_exams(self, conducting_body=None):
+        """Same rows as queries.feed_exams, from memory"""
+        records = list(self.exams_for(conducting_body).records)
+        records += [
+            record for record in self.undated_records
+            if record.application_start is not None and record.application_end is not None
+            and (not conducting_body or record.conducting_body == conducting_body)
+        ]
+        records.sort(key=lambda record: record.id)
+        return [
+            (record.id, record.exam_name, record.conducting_body, record.exam_date,
+             record.application_start, record.application_end, record.official_link)
+            for record in records
+        ]
+
+    def memory_usage(self):
+        """Approximate bytes held by the index (records, their values and payloads)"""
+        total = 0
+        for exams in [self.all, *self.by_body.values()]:
+            total += sum(sys.getsizeof(items) for items in (exams.dates, exams.records, exams.month_payloads, exams.range_payloads))
+        # Records and payloads are shared between the all-bodies and per-body lists
+        for record, month_payload, range_payload in zip(self.all.records, self.all.month_payloads, self.all.range_payloads):
+            total += sys.getsizeof(record) + sys.getsizeof(month_payload) + sys.getsizeof(range_payload)
+            total += sum(sys.getsizeof(value) for value in record if value is not None)
+        total += sum(windows.memory_usage() for windows in self.applications.values())
+        total += sys.getsizeof(self.by_id) + sys.getsizeof(self.undated_records)
+        total += sum(sys.getsizeof(weeks) for weeks in self.clash_weeks.values())
+        return total
+
+    def stats(self):
+        return {
+            "generation": self.generation,
+            "exams": self.exam_count,
+            "dated_exams": len(self.all.dates),
+            "bodies": len(set(self.by_body) | set(self.undated)),
+            "memory_bytes": self.memory_usage(),
+            "built_at": self.built_at.isoformat()
+        }
+
+def build_calendar_index(db):
+    """Build an index from an open session, logging its size and build time"""
+    started = time.perf_counter()
+    index = CalendarIndex.build(db)
+    logger.info(
+        f"Built calendar index for generation {index.generation}: {index.exam_count} exams, "
+        f"{index.memory_usage() / 1024 / 1024:.1f} MB in {time.perf_counter() - started:.2f}s"
+    )
+    return index
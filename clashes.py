@@ -0,0 +1,83 @@
+from datetime import timedelta
+from itertools import groupby
+
+# Exams this many days apart or closer (but not on the same day) are
+# reported as a tight gap
+DEFAULT_GAP_DAYS = 2
+
+# How many clash-heavy weeks the calendar page lists
+HEAVY_WEEKS_LIMIT = 5
+
+def week_start(day):
+    """Monday of the week containing day (the calendar starts weeks on Monday)"""
+    return day - timedelta(days=day.weekday())
+
+def sweep(exams, gap_days=DEFAULT_GAP_DAYS):
+    """
+    Sweep exams sorted by (day, id) once, where each exam is a tuple
+    (id, name, body, day). Returns:
+
+    - clashes: (day, [exams]) for every day with two or more exams
+    - gaps: (earlier day, later day, days apart, [earlier exams], [later exams])
+      for consecutive exam days at most gap_days apart
+    - weeks: {monday: [exam count, exams on clashing days]}
+    """
+    clashes = []
+    gaps = []
+    weeks = {}
+    previous_day = previous_group = None
+    for day, group in groupby(exams, key=lambda exam: exam[3]):
+        group = list(group)
+        week = weeks.setdefault(week_start(day), [0, 0])
+        week[0] += len(group)
+        if len(group) > 1:
+            clashes.append((day, group))
+            week[1] += len(group)
+        if previous_day is not None and (day - previous_day).days <= gap_days:
+            gaps.append((previous_day, day, (day - previous_day).days, previous_group, group))
+        previous_day, previous_group = day, group
+    return clashes, gaps, weeks
+
+def heavy_weeks(weeks, since=None, limit=HEAVY_WEEKS_LIMIT):
+    """The weeks (from `since` on) with the most exams on clashing days, busiest first"""
+    candidates = [
+        (monday, exam_count, clashing)
+        for monday, (exam_count, clashing) in weeks.items()
+        if clashing and (since is None or monday >= week_start(since))
+    ]
+    candidates.sort(key=lambda week: (-week[2], week[0]))
+    return [
+        {
+            "week_start": monday.isoformat(),
+            "label": monday.strftime('%d %b %Y'),
+            "exams": exam_count,
+            "clashing_exams": clashing
+        }
+        for monday, exam_count, clashing in candidates[:limit]
+    ]
+
+def exam_summary(exam):
+    return {"id": exam[0], "name": exam[1], "body": exam[2]}
+
+def clash_report(exams, gap_days=DEFAULT_GAP_DAYS, limit=100):
+    """Clashes, tight gaps and clash-heavy weeks among exams sorted by (day, id)"""
+    clashes, gaps, weeks = sweep(exams, gap_days)
+    return {
+        "clash_days": len(clashes),
+        "clashes": [
+            {"date": day.isoformat(), "exams": [exam_summary(exam) for exam in group]}
+            for day, group in clashes[:limit]
+        ],
+        "tight_gap_count": len(gaps),
+        "tight_gaps": [
+            {
+                "first_date": first.isoformat(),
+                "second_date": second.isoformat(),
+                "days_apart": days_apart,
+                "first_exams": [exam_summary(exam) for exam in first_group],
+                "second_exams": [exam_summary(exam) for exam in second_group]
+            }
+            for first, second, days_apart, first_group, second_group in gaps[:limit]
+        ],
+        "heavy_weeks": heavy_weeks(weeks, limit=limit)
+    }
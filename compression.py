@@ -0,0 +1,224 @@
+import gzip
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Brotli responses are optional; gzip always works
+    brotli = None
+
+# Bodies smaller than this go out as they are: the encoding headers and the
+# CPU aren't worth it for a few hundred bytes
+MIN_COMPRESS_SIZE = 1024
+
+# Compression levels: fast enough to run on the request path, and cached
+# responses are only compressed once per encoding anyway
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Content types worth compressing (anything text-like). Event streams are
+# left alone so proxies don't buffer them.
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/msgpack", "application/xml"
+)
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    codings = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+def is_compressible(content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type.startswith(UNCOMPRESSED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+class CachedBody:
+    """
+    A response body as stored in the response cache: the raw bytes plus
+    each encoding of them, compressed the first time a client asks for it.
+    None marks an encoding that didn't make the body smaller.
+    """
+    __slots__ = ('raw', 'encoded')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.encoded = {}
+
+class Compressor:
+    """
+    Content-encoding negotiation and compression with counters. Brotli is
+    preferred over gzip when a client accepts both equally.
+    """
+
+    def __init__(self, minimum_size=MIN_COMPRESS_SIZE):
+        self.minimum_size = minimum_size
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self.compressions = 0
+        self.cached_hits = 0
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encoding):
+        """The encoding to use for a request's Accept-Encoding, or None for identity"""
+        codings = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = codings.get(encoding, codings.get('*', 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compress(self, data, encoding):
+        self.compressions += 1
+        if encoding == "br":
+            return brotli.compress(data, quality=BROTLI_QUALITY)
+        # mtime=0 keeps the output (and so the cache) deterministic
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def record(self, raw_size, sent_size):
+        self.responses += 1
+        self.bytes_in += raw_size
+        self.bytes_out += sent_size
+
+    def encode_cached(self, body, encoding):
+        """
+        (content, encoding) to send for a CachedBody, compressing it at most
+        once per encoding; encoding is None when the raw body is sent.
+        """
+        if encoding is None or len(body.raw) < self.minimum_size:
+            return body.raw, None
+        if encoding in body.encoded:
+            self.cached_hits += 1
+            content = body.encoded[encoding]
+        else:
+            content = self.compress(body.raw, encoding)
+            if len(content) >= len(body.raw):
+                content = None
+            body.encoded[encoding] = content
+        if content is None:
+            return body.raw, None
+        self.record(len(body.raw), len(content))
+        return content, encoding
+
+    def stream(self, encoding):
+        """(compress, flush, finish) functions for a streamed body"""
+        self.compressions += 1
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            return compressor.process, compressor.flush, compressor.finish
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+        return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    def stats(self):
+        return {
+            "encodings": list(self.encodings),
+            "minimum_size": self.minimum_size,
+            "compressions": self.compressions,
+            "cached_hits": self.cached_hits,
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out
+        }
+
+class CompressionMiddleware:
+    """
+    Compresses responses that haven't negotiated an encoding themselves
+    (cached responses already vary on Accept-Encoding) when the client
+    accepts gzip or brotli. Complete bodies under
+    the minimum size are sent as is; streamed bodies are compressed chunk
+    by chunk, flushing after each so clients see rows as they are sent.
+    """
+
+    def __init__(self, app, compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.compressor.negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compressor = self.compressor
+        start_message = None
+        passthrough = False
+        stream = None
+        raw_size = sent_size = 0
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough, stream, raw_size, sent_size
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                start_message = message
+                passthrough = (
+                    message["status"] != 200
+                    or "content-encoding" in headers
+                    or "accept-encoding" in headers.get("vary", "").lower()
+                    or not is_compressible(headers.get("content-type"))
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body:
+                    # Complete body: compress it in one go if it's big enough
+                    content = compressor.compress(body, encoding) if len(body) >= compressor.minimum_size else None
+                    if content is None or len(content) >= len(body):
+                        headers.add_vary_header("Accept-Encoding")
+                        await send(start_message)
+                        await send(message)
+                        return
+                    compressor.record(len(body), len(content))
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(content))
+                    headers.add_vary_header("Accept-Encoding")
+                    await send(start_message)
+                    await send({**message, "body": content})
+                    return
+
+                stream = compressor.stream(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                await send(start_message)
+
+            compress, flush, finish = stream
+            chunk = compress(body) + (flush() if more_body else finish())
+            raw_size += len(body)
+            sent_size += len(chunk)
+            if not more_body:
+                compressor.record(raw_size, sent_size)
+            await send({**message, "body": chunk})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, func
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey, func, insert, literal, select, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from contextlib import contextmanager
+import json
 import logging
+import os
+import shutil
+import sqlite3
 from datetime import datetime
 
 # Set up logging
@@ -16,7 +23,7 @@ class Exam(Base):
     id = Column(Integer, primary_key=True)
     exam_name = Column(String, nullable=False)
     conducting_body = Column(String, nullable=False)
-    exam_date = Column(DateTime, nullable=True)
+    exam_date = Column(DateTime, nullable=True, index=True)
     application_start = Column(DateTime, nullable=True)
     application_end = Column(DateTime, nullable=True)
     official_link = Column(String, nullable=True)
@@ -24,24 +31,145 @@ class Exam(Base):
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
+class ExamSource(Base):
+    """Provenance: one row per (exam, source, title) that reported an exam"""
+    __tablename__ = 'exam_sources'
+
+    id = Column(Integer, primary_key=True)
+    exam_id = Column(Integer, ForeignKey('exams.id'), nullable=False, index=True)
+    exam_name = Column(String, nullable=False, index=True)
+    conducting_body = Column(String, nullable=False)
+    source_url = Column(String, nullable=True)
+    official_link = Column(String, nullable=True)
+    seen_at = Column(DateTime, default=func.now(), nullable=False)
+
+class ExamChange(Base):
+    """Append-only change log; seq is a monotonic cursor for delta sync"""
+    __tablename__ = 'exam_changes'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = Column(Integer, primary_key=True)
+    exam_id = Column(Integer, nullable=False, index=True)
+    operation = Column(String, nullable=False)  # insert, update or delete
+    data = Column(Text, nullable=True)  # JSON snapshot of the row after the change
+    changed_at = Column(DateTime, default=func.now(), nullable=False)
+
+class ExamStat(Base):
+    """
+    Materialized exam counts per conducting body and exam day ('' if undated).
+    Small enough that every statistic is one aggregate over this table.
+    """
+    __tablename__ = 'exam_stats'
+
+    conducting_body = Column(String, primary_key=True)
+    exam_day = Column(String, primary_key=True)
+    exam_count = Column(Integer, nullable=False, default=0)
+
+class DataGeneration(Base):
+    """Single-row table holding the generation number of the published dataset"""
+    __tablename__ = 'data_generation'
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    published_at = Column(DateTime, nullable=True)
+
+class ScrapeState(Base):
+    __tablename__ = 'scrape_state'
+
+    source = Column(String, primary_key=True)
+    last_run_at = Column(DateTime, nullable=True)
+
+class FeedEntry(Base):
+    __tablename__ = 'feed_entries'
+
+    source = Column(String, primary_key=True)
+    guid = Column(String, primary_key=True)
+    seen_at = Column(DateTime, default=func.now(), nullable=False)
+
+# Database files. Ingestion writes to the staging copy and publishes it by
+# atomically renaming it over the live file; the replaced file is kept as
+# the previous generation for rollback.
+DATABASE_PATH = 'exams.db'
+STAGING_PATH = 'exams.staging.db'
+PREVIOUS_PATH = 'exams.previous.db'
+
+# Staged data is rejected if it lost more than half of the live upcoming exams
+MIN_RETAINED_FRACTION = 0.5
+
+def create_db_engine(path):
+    """
+    Create an engine for a database file. Connections are not pooled, so
+    every session opens whichever file is live at that moment.
+    """
+    return create_engine(f'sqlite:///{path}', poolclass=NullPool)
+
 # Create database engine
-engine = create_engine('sqlite:///exams.db')
+engine = create_db_engine(DATABASE_PATH)
 
 # Create a session factory
 Session = sessionmaker(bind=engine)
 
+# Full-text index over exams. It is an external-content FTS5 table, so it
+# stores only the index; triggers keep it in step with every write to exams.
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS exams_fts USING fts5(
+        exam_name, conducting_body, source_url,
+        content='exams', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS exams_fts_insert AFTER INSERT ON exams BEGIN
+        INSERT INTO exams_fts(rowid, exam_name, conducting_body, source_url)
+        VALUES (new.id, new.exam_name, new.conducting_body, new.source_url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS exams_fts_delete AFTER DELETE ON exams BEGIN
+        INSERT INTO exams_fts(exams_fts, rowid, exam_name, conducting_body, source_url)
+        VALUES ('delete', old.id, old.exam_name, old.conducting_body, old.source_url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS exams_fts_update AFTER UPDATE OF exam_name, conducting_body, source_url ON exams BEGIN
+        INSERT INTO exams_fts(exams_fts, rowid, exam_name, conducting_body, source_url)
+        VALUES ('delete', old.id, old.exam_name, old.conducting_body, old.source_url);
+        INSERT INTO exams_fts(rowid, exam_name, conducting_body, source_url)
+        VALUES (new.id, new.exam_name, new.conducting_body, new.source_url);
+    END""",
+]
+
+def create_search_index(bind):
+    """Create the exams_fts index and its triggers, indexing existing rows if it is new"""
+    with bind.begin() as connection:
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'exams_fts'"
+        )).first()
+        for statement in SEARCH_INDEX_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO exams_fts(exams_fts) VALUES ('rebuild')"))
+            logger.info("Built full-text search index for existing exams")
+
 def init_db():
     """Initialize the database tables"""
     logger.info("Initializing database tables")
     try:
         Base.metadata.create_all(engine)
+        # create_all skips existing tables, including indexes added since
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+        create_search_index(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {str(e)}")
         raise
 
+# Fields an alias never overwrites on its canonical exam
+ALIAS_KEPT_FIELDS = ('exam_name', 'conducting_body', 'official_link', 'source_url')
+
 def add_or_update_exam(exam_data):
-    """Add a new exam or update existing one"""
+    """
+    Add a new exam or update existing one.
+
+    Titles that duplicate resolution has already merged into another exam
+    are recorded as aliases in exam_sources, so they update that canonical
+    exam instead of creating a new row.
+    """
     session = Session()
     try:
         # Check if exam already exists
@@ -52,17 +180,51 @@ def add_or_update_exam(exam_data):
         ).first()
         
         if existing_exam:
-            # Update existing exam
+            # Update existing exam (same name, body and date, so stats are unchanged)
             for key, value in exam_data.items():
                 setattr(existing_exam, key, value)
-            existing_exam.updated_at = datetime.now()
-            logger.info(f"Updated exam: {exam_data['exam_name']}")
+            # Re-scraping an unchanged exam is not a change
+            operation = 'update' if session.is_modified(existing_exam) else None
+            if operation:
+                existing_exam.updated_at = datetime.now()
+                logger.info(f"Updated exam: {exam_data['exam_name']}")
         else:
-            # Add new exam
-            new_exam = Exam(**exam_data)
-            session.add(new_exam)
-            logger.info(f"Added new exam: {exam_data['exam_name']}")
-        
+            alias = session.query(ExamSource).filter(
+                ExamSource.exam_name == exam_data['exam_name'],
+                ExamSource.conducting_body == exam_data['conducting_body']
+            ).first()
+            alias_exam = session.get(Exam, alias.exam_id) if alias else None
+
+            if alias_exam and alias_exam.exam_date in (None, exam_data['exam_date']):
+                # Known alias: only fill in what the canonical row lacks. Its
+                # name, body and links stay; each source's own title and
+                # links are kept in exam_sources
+                existing_exam = alias_exam
+                previous_date = existing_exam.exam_date
+                for key, value in exam_data.items():
+                    if key in ALIAS_KEPT_FIELDS or value is None:
+                        continue
+                    if getattr(existing_exam, key) is None:
+                        setattr(existing_exam, key, value)
+                operation = 'update' if session.is_modified(existing_exam) else None
+                if operation:
+                    existing_exam.updated_at = datetime.now()
+                    if existing_exam.exam_date != previous_date:
+                        adjust_exam_stat(session, existing_exam.conducting_body, previous_date, -1)
+                        adjust_exam_stat(session, existing_exam.conducting_body, existing_exam.exam_date, 1)
+                    logger.info(f"Updated exam {existing_exam.exam_name} via alias: {exam_data['exam_name']}")
+            else:
+                # Add new exam
+                existing_exam = Exam(**exam_data)
+                session.add(existing_exam)
+                operation = 'insert'
+                adjust_exam_stat(session, existing_exam.conducting_body, existing_exam.exam_date, 1)
+                logger.info(f"Added new exam: {exam_data['exam_name']}")
+
+        session.flush()
+        record_exam_source(session, existing_exam.id, exam_data)
+        if operation:
+            record_exam_change(session, existing_exam, operation)
         session.commit()
         
     except Exception as e:
@@ -72,6 +234,96 @@ def add_or_update_exam(exam_data):
     finally:
         session.close()
 
+def adjust_exam_stat(session, conducting_body, exam_date, delta):
+    """Incrementally add `delta` to one materialized stats bucket"""
+    exam_day = exam_date.strftime('%Y-%m-%d') if exam_date else ''
+    statement = sqlite_insert(ExamStat).values(
+        conducting_body=conducting_body, exam_day=exam_day, exam_count=delta
+    )
+    session.execute(statement.on_conflict_do_update(
+        index_elements=['conducting_body', 'exam_day'],
+        set_={'exam_count': ExamStat.exam_count + delta}
+    ))
+
+def refresh_exam_stats(session):
+    """Recompute the materialized stats table with one GROUP BY over exams"""
+    session.query(ExamStat).delete()
+    session.execute(text(
+        "INSERT INTO exam_stats (conducting_body, exam_day, exam_count) "
+        "SELECT conducting_body, COALESCE(date(exam_date), ''), COUNT(*) "
+        "FROM exams GROUP BY 1, 2"
+    ))
+
+def record_exam_source(session, exam_id, exam_data):
+    """Record (or refresh) which source reported an exam under which title"""
+    source = session.query(ExamSource).filter(
+        ExamSource.exam_id == exam_id,
+        ExamSource.exam_name == exam_data['exam_name'],
+        ExamSource.source_url == exam_data.get('source_url')
+    ).first()
+    if source:
+        source.official_link = exam_data.get('official_link')
+        source.seen_at = datetime.now()
+    else:
+        session.add(ExamSource(
+            exam_id=exam_id,
+            exam_name=exam_data['exam_name'],
+            conducting_body=exam_data['conducting_body'],
+            source_url=exam_data.get('source_url'),
+            official_link=exam_data.get('official_link'),
+            seen_at=datetime.now()
+        ))
+
+def exam_to_dict(exam):
+    """Serialize an exam row into plain JSON-compatible values"""
+    def iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        "id": exam.id,
+        "exam_name": exam.exam_name,
+        "conducting_body": exam.conducting_body,
+        "exam_date": iso(exam.exam_date),
+        "application_start": iso(exam.application_start),
+        "application_end": iso(exam.application_end),
+        "official_link": exam.official_link,
+        "source_url": exam.source_url,
+        "updated_at": iso(exam.updated_at)
+    }
+
+def record_exam_change(session, exam, operation):
+    """Append an insert/update/delete of an exam to the change log"""
+    data = json.dumps(exam_to_dict(exam)) if operation != 'delete' else None
+    session.add(ExamChange(exam_id=exam.id, operation=operation, data=data, changed_at=datetime.now()))
+
+def get_exam_changes(since=0, limit=500, session=None):
+    """
+    Return up to `limit` changes with seq greater than `since`, oldest first.
+    Uses the primary key as a keyset cursor, so each page is an index range scan.
+    """
+    owns_session = session is None
+    session = session or Session()
+    try:
+        changes = session.query(ExamChange).filter(
+            ExamChange.seq > since
+        ).order_by(ExamChange.seq).limit(limit).all()
+        return [
+            {
+                "seq": change.seq,
+                "exam_id": change.exam_id,
+                "operation": change.operation,
+                "exam": json.loads(change.data) if change.data else None,
+                "changed_at": change.changed_at.isoformat()
+            }
+            for change in changes
+        ]
+    except Exception as e:
+        logger.error(f"Error retrieving exam changes since {since}: {str(e)}")
+        raise
+    finally:
+        if owns_session:
+            session.close()
+
 def get_all_exams():
     """Retrieve all exams from the database"""
     session = Session()
@@ -119,6 +371,15 @@ def delete_old_exams(days=90):
     try:
         from datetime import datetime, timedelta
         cutoff_date = datetime.now() - timedelta(days=days)
+        old_exam_ids = session.query(Exam.id).filter(Exam.exam_date < cutoff_date).scalar_subquery()
+        # Log the deletions in one INSERT ... SELECT before removing the rows
+        session.execute(
+            insert(ExamChange).from_select(
+                ['exam_id', 'operation', 'changed_at'],
+                select(Exam.id, literal('delete'), literal(datetime.now())).where(Exam.exam_date < cutoff_date).order_by(Exam.id)
+            )
+        )
+        session.query(ExamSource).filter(ExamSource.exam_id.in_(old_exam_ids)).delete(synchronize_session=False)
         session.query(Exam).filter(Exam.exam_date < cutoff_date).delete()
         session.commit()
         logger.info(f"Deleted exams older than {days} days")
@@ -127,4 +388,316 @@ def delete_old_exams(days=90):
         session.rollback()
         raise
     finally:
-        session.close() 
\ No newline at end of file
+        session.close()
+
+def get_last_run(source):
+    """Return when a scraper last completed, or None if it never has"""
+    session = Session()
+    try:
+        state = session.get(ScrapeState, source)
+        return state.last_run_at if state else None
+    except Exception as e:
+        logger.error(f"Error retrieving last run for {source}: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+def set_last_run(source, run_at):
+    """Record when a scraper last completed"""
+    session = Session()
+    try:
+        state = session.get(ScrapeState, source)
+        if state:
+            state.last_run_at = run_at
+        else:
+            session.add(ScrapeState(source=source, last_run_at=run_at))
+        session.commit()
+    except Exception as e:
+        logger.error(f"Error recording last run for {source}: {str(e)}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def get_seen_feed_guids(source):
+    """Return the set of feed entry GUIDs already processed for a source"""
+    session = Session()
+    try:
+        rows = session.query(FeedEntry.guid).filter(FeedEntry.source == source).all()
+        return {row[0] for row in rows}
+    except Exception as e:
+        logger.error(f"Error retrieving feed entries for {source}: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+def mark_feed_guids_seen(source, guids, keep_days=90):
+    """Record processed feed entry GUIDs and forget ones older than keep_days"""
+    session = Session()
+    try:
+        from datetime import timedelta
+        existing = {
+            row[0] for row in session.query(FeedEntry.guid).filter(
+                FeedEntry.source == source,
+                FeedEntry.guid.in_(guids)
+            ).all()
+        } if guids else set()
+        for guid in set(guids) - existing:
+            session.add(FeedEntry(source=source, guid=guid, seen_at=datetime.now()))
+
+        cutoff_date = datetime.now() - timedelta(days=keep_days)
+        session.query(FeedEntry).filter(
+            FeedEntry.source == source,
+            FeedEntry.seen_at < cutoff_date
+        ).delete()
+        session.commit()
+    except Exception as e:
+        logger.error(f"Error recording feed entries for {source}: {str(e)}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def _link_or_copy(source, target):
+    """Hard-link a database file, copying it where links aren't supported"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def get_data_generation(session=None):
+    """Return the generation number of the dataset a session is reading"""
+    owns_session = session is None
+    session = session or Session()
+    try:
+        row = session.get(DataGeneration, 1)
+        return row.generation if row else 0
+    finally:
+        if owns_session:
+            session.close()
+
+# (inode, mtime, size) of the live file -> generation read from it
+_generation_cache = {'signature': None, 'generation': 0, 'published_at': None}
+
+def _refresh_generation_cache():
+    """
+    Re-read the live generation if the live file changed since the last call.
+
+    Publishing swaps in a new file, so a stat() is enough to notice a new
+    generation; the row itself is only read again when the file changed.
+    """
+    try:
+        stat = os.stat(DATABASE_PATH)
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        signature = None
+
+    if signature is None or signature != _generation_cache['signature']:
+        session = Session()
+        try:
+            row = session.get(DataGeneration, 1)
+            _generation_cache['generation'] = row.generation if row else 0
+            _generation_cache['published_at'] = row.published_at if row else None
+        finally:
+            session.close()
+        _generation_cache['signature'] = signature
+    return _generation_cache
+
+def current_data_generation():
+    """Return the live dataset's generation number cheaply"""
+    return _refresh_generation_cache()['generation']
+
+def current_data_signature():
+    """(inode, mtime, size) of the live file, which changes with every commit to it"""
+    return _refresh_generation_cache()['signature']
+
+def current_data_published_at():
+    """Return when the live generation was published, or None if it never was"""
+    return _refresh_generation_cache()['published_at']
+
+def begin_staged_ingest():
+    """
+    Start an ingest run against a private copy of the live database.
+
+    All db helpers write to the staging file until publish_staged_ingest()
+    or discard_staged_ingest() is called, so readers of the live file never
+    see a half-updated dataset or wait on ingest locks.
+    """
+    init_db()
+    if os.path.exists(STAGING_PATH):
+        os.remove(STAGING_PATH)
+
+    # The backup API takes a consistent snapshot even while readers are active
+    source = sqlite3.connect(DATABASE_PATH)
+    target = sqlite3.connect(STAGING_PATH)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+    staging_engine = create_db_engine(STAGING_PATH)
+    Base.metadata.create_all(staging_engine)
+    create_search_index(staging_engine)
+    Session.configure(bind=staging_engine)
+    logger.info(f"Started staged ingest in {STAGING_PATH}")
+
+def validate_staged_database():
+    """
+    Check the staging file before it is published; raises ValueError if unfit.
+    Only current exams are compared, so pruning past exams is always allowed.
+    """
+    current_exams = "SELECT COUNT(*) FROM exams WHERE exam_date IS NULL OR exam_date >= ?"
+    now = datetime.now().isoformat(' ')
+
+    connection = sqlite3.connect(STAGING_PATH)
+    try:
+        result = connection.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != 'ok':
+            raise ValueError(f"Integrity check failed: {result}")
+        staged_count = connection.execute("SELECT COUNT(*) FROM exams").fetchone()[0]
+        staged_current = connection.execute(current_exams, (now,)).fetchone()[0]
+    finally:
+        connection.close()
+
+    connection = sqlite3.connect(DATABASE_PATH)
+    try:
+        live_current = connection.execute(current_exams, (now,)).fetchone()[0]
+    finally:
+        connection.close()
+
+    if staged_current < live_current * MIN_RETAINED_FRACTION:
+        raise ValueError(f"Staged data has {staged_current} current exams, live data has {live_current}")
+    return staged_count
+
+def publish_staged_ingest():
+    """
+    Validate the staging file, bump its generation and swap it in atomically.
+    Returns the new generation number.
+    """
+    try:
+        # Deletes and merges don't maintain the stats incrementally; rebuild them
+        session = Session()
+        try:
+            refresh_exam_stats(session)
+            session.commit()
+        finally:
+            session.close()
+        Session.configure(bind=engine)
+
+        staged_count = validate_staged_database()
+
+        connection = sqlite3.connect(STAGING_PATH)
+        try:
+            with connection:
+                row = connection.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()
+                generation = (row[0] if row else 0) + 1
+                connection.execute(
+                    "INSERT OR REPLACE INTO data_generation (id, generation, published_at) VALUES (1, ?, ?)",
+                    (generation, datetime.now().isoformat(' '))
+                )
+        finally:
+            connection.close()
+
+        # Keep the current live file as the previous generation, then swap
+        if os.path.exists(PREVIOUS_PATH):
+            os.remove(PREVIOUS_PATH)
+        _link_or_copy(DATABASE_PATH, PREVIOUS_PATH)
+        os.replace(STAGING_PATH, DATABASE_PATH)
+
+        logger.info(f"Published generation {generation} with {staged_count} exams")
+        return generation
+    except Exception as e:
+        logger.error(f"Staged data not published, live data left unchanged: {str(e)}")
+        discard_staged_ingest()
+        raise
+
+def discard_staged_ingest():
+    """Abandon an ingest run and delete its staging file"""
+    Session.configure(bind=engine)
+    if os.path.exists(STAGING_PATH):
+        os.remove(STAGING_PATH)
+        logger.info(f"Discarded {STAGING_PATH}")
+
+@contextmanager
+def staged_ingest():
+    """Run a block of writes as one staged ingest, published when the block succeeds"""
+    begin_staged_ingest()
+    try:
+        yield
+    except Exception:
+        discard_staged_ingest()
+        raise
+    publish_staged_ingest()
+
+def record_rollback_changes(session, current):
+    """
+    Append the changes that turn the `current` exams (id -> exam_to_dict)
+    into the exams of the session's database, so delta-sync clients
+    following the current change log end up with the restored data
+    """
+    restored = {exam.id: exam for exam in session.query(Exam)}
+    changes = 0
+    for exam_id in sorted(current.keys() - restored.keys()):
+        session.add(ExamChange(exam_id=exam_id, operation='delete', data=None, changed_at=datetime.now()))
+        changes += 1
+    for exam_id, exam in sorted(restored.items()):
+        if exam_id not in current:
+            record_exam_change(session, exam, 'insert')
+            changes += 1
+        elif exam_to_dict(exam) != current[exam_id]:
+            record_exam_change(session, exam, 'update')
+            changes += 1
+    return changes
+
+def rollback_generation():
+    """
+    Swap the previous generation back in, keeping the current one as previous.
+
+    The restored data is published under a new generation number, and its
+    change log continues after the live one's last seq with the changes
+    that undo the current generation, so ETags, caches and delta-sync
+    cursors handed out for the current generation stay valid.
+    """
+    if not os.path.exists(PREVIOUS_PATH):
+        raise FileNotFoundError(f"No previous generation at {PREVIOUS_PATH}")
+
+    session = Session(bind=engine)
+    try:
+        live_generation = get_data_generation(session)
+        live_seq = session.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = 'exam_changes'")
+        ).scalar() or 0
+        current = {exam.id: exam_to_dict(exam) for exam in session.query(Exam)}
+    finally:
+        session.close()
+
+    previous_engine = create_db_engine(PREVIOUS_PATH)
+    session = Session(bind=previous_engine)
+    try:
+        generation = max(live_generation, get_data_generation(session)) + 1
+        session.merge(DataGeneration(id=1, generation=generation, published_at=datetime.now()))
+        # Changes recorded from here on follow the live log's last seq
+        session.execute(text("DELETE FROM sqlite_sequence WHERE name = 'exam_changes'"))
+        session.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES ('exam_changes', :seq)"),
+            {"seq": max(live_seq, session.query(func.max(ExamChange.seq)).scalar() or 0)}
+        )
+        changes = record_rollback_changes(session, current)
+        session.commit()
+    except Exception as e:
+        logger.error(f"Error preparing rollback: {str(e)}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        previous_engine.dispose()
+
+    rollback_path = f"{DATABASE_PATH}.rollback"
+    if os.path.exists(rollback_path):
+        os.remove(rollback_path)
+    _link_or_copy(DATABASE_PATH, rollback_path)
+    os.replace(PREVIOUS_PATH, DATABASE_PATH)
+    os.replace(rollback_path, PREVIOUS_PATH)
+    logger.info(f"Rolled back to the previous data as generation {generation} ({changes} changes logged)")
+    return generation
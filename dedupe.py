@@ -0,0 +1,285 @@
+import logging
+import random
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from db import Session, Exam, ExamSource, record_exam_change, staged_ingest
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH parameters. 8 bands of 4 rows put the LSH "S-curve"
+# threshold at roughly (1/8) ** (1/4) ~= 0.6 Jaccard similarity.
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+
+# Candidate pairs must reach this token Jaccard similarity to be merged
+MATCH_THRESHOLD = 0.6
+
+# Buckets larger than this (very generic titles, or the same title repeated
+# across years) are not expanded into all pairs. Their members are sorted
+# and each one is only compared with its next NEIGHBOUR_WINDOW neighbours,
+# which keeps candidate generation near-linear.
+MAX_BUCKET_SIZE = 200
+NEIGHBOUR_WINDOW = 20
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240101)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Words that differ between sources without changing which exam is meant
+NOISE_WORDS = {
+    'a', 'an', 'and', 'the', 'of', 'for', 'in', 'to', 'on',
+    'exam', 'examination', 'recruitment', 'notification', 'online', 'form',
+    'apply', 'application', 'advt', 'advertisement', 'post', 'posts',
+    'vacancy', 'vacancies', 'latest', 'date', 'dates', 'out', 'released',
+    'official', 'notice', 'govt', 'government', 'job', 'jobs'
+}
+
+YEAR_PATTERN = re.compile(r'^(19|20)\d{2}$')
+
+def normalize_title(title):
+    """Lowercase a title and reduce it to its significant words"""
+    words = re.findall(r'[a-z0-9]+', (title or '').lower())
+    return ' '.join(word for word in words if word not in NOISE_WORDS)
+
+def title_tokens(title):
+    """Return the set of significant words in a title"""
+    return frozenset(normalize_title(title).split())
+
+# Per-token permuted hashes; title vocabularies are small, so caching these
+# turns each signature into an element-wise min over a few cached tuples.
+_token_hashes = {}
+
+def _token_hash(token):
+    hashes = _token_hashes.get(token)
+    if hashes is None:
+        h = zlib.crc32(token.encode('utf-8'))
+        hashes = tuple((a * h + b) % _PRIME for a, b in _PERMUTATIONS)
+        _token_hashes[token] = hashes
+    return hashes
+
+def minhash(tokens):
+    """Compute a MinHash signature for a set of tokens"""
+    if not tokens:
+        return None
+    return tuple(map(min, zip(*(_token_hash(token) for token in tokens))))
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class LSHIndex:
+    """Banded MinHash index that groups signatures sharing any band"""
+
+    def __init__(self, bands=BANDS, rows=ROWS):
+        self.bands = bands
+        self.rows = rows
+        self.buckets = defaultdict(list)
+
+    def add(self, key, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            self.buckets[(band, signature[start:start + self.rows])].append(key)
+
+    def candidate_pairs(self, sort_key=None):
+        """Yield each pair of keys that share at least one bucket, once"""
+        seen = set()
+        oversized = 0
+        for bucket in self.buckets.values():
+            if len(bucket) < 2:
+                continue
+            window = len(bucket)
+            if len(bucket) > MAX_BUCKET_SIZE:
+                oversized += 1
+                bucket = sorted(bucket, key=sort_key)
+                window = NEIGHBOUR_WINDOW
+            for i in range(len(bucket)):
+                for j in range(i + 1, min(i + 1 + window, len(bucket))):
+                    pair = (bucket[i], bucket[j]) if bucket[i] < bucket[j] else (bucket[j], bucket[i])
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+        if oversized:
+            logger.info(f"Used neighbourhood comparison for {oversized} oversized LSH buckets")
+
+def is_same_exam(a, b):
+    """
+    Decide whether two candidate records describe the same exam.
+    Records are dictionaries with tokens, conducting_body and exam_date.
+    """
+    if a['conducting_body'] != b['conducting_body'] and 'OTHER' not in (a['conducting_body'], b['conducting_body']):
+        return False
+    if a['exam_date'] and b['exam_date'] and a['exam_date'].date() != b['exam_date'].date():
+        return False
+
+    # "SSC CGL 2024" and "SSC CGL 2025" are different exams
+    years_a = {token for token in a['tokens'] if YEAR_PATTERN.match(token)}
+    years_b = {token for token in b['tokens'] if YEAR_PATTERN.match(token)}
+    if years_a and years_b and years_a != years_b:
+        return False
+
+    return jaccard(a['tokens'], b['tokens']) >= MATCH_THRESHOLD
+
+def cluster_traits(record):
+    """(exam day, conducting body, title years) of a record, None where unknown"""
+    years = frozenset(token for token in record['tokens'] if YEAR_PATTERN.match(token))
+    return (
+        record['exam_date'].date() if record['exam_date'] else None,
+        record['conducting_body'] if record['conducting_body'] != 'OTHER' else None,
+        years or None
+    )
+
+def merge_traits(a, b):
+    """Traits of two clusters joined, or None if what they know conflicts"""
+    merged = []
+    for value_a, value_b in zip(a, b):
+        if value_a is not None and value_b is not None and value_a != value_b:
+            return None
+        merged.append(value_a if value_a is not None else value_b)
+    return tuple(merged)
+
+def find_duplicate_groups(records):
+    """
+    Group records (id -> record dict) into clusters of duplicates.
+
+    Candidate pairs come from the LSH index, so the work grows with the
+    number of records rather than the number of pairs.
+    """
+    index = LSHIndex()
+    for exam_id, record in records.items():
+        signature = minhash(record['tokens'])
+        if signature:
+            index.add(exam_id, signature)
+
+    # Union-find over verified matches. Each root also holds what is known
+    # about its whole cluster (exam day, body, title years): an undated or
+    # OTHER record matches exams on any date or body, and must not chain
+    # two clusters together that don't match each other.
+    parent = {}
+    known = {}
+
+    def find(x):
+        if x not in parent:
+            parent[x] = x
+            known[x] = cluster_traits(records[x])
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def sort_key(exam_id):
+        record = records[exam_id]
+        return (record['exam_date'] or datetime.min, exam_id)
+
+    for a, b in index.candidate_pairs(sort_key):
+        if is_same_exam(records[a], records[b]):
+            root_a, root_b = find(a), find(b)
+            if root_a == root_b:
+                continue
+            merged = merge_traits(known[root_a], known[root_b])
+            if merged is None:
+                continue
+            root, child = min(root_a, root_b), max(root_a, root_b)
+            parent[child] = root
+            known[root] = merged
+            del known[child]
+
+    groups = defaultdict(list)
+    for exam_id in parent:
+        groups[find(exam_id)].append(exam_id)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+def merge_group(session, exam_ids):
+    """
+    Merge a group of duplicate exams into one canonical row.
+
+    The canonical exam is the most complete record (oldest on ties). Missing
+    fields are filled from the duplicates, every title/source is kept in
+    exam_sources, and the duplicate rows are deleted.
+    """
+    exams = session.query(Exam).filter(Exam.id.in_(exam_ids)).all()
+    if len(exams) < 2:
+        return 0
+
+    def completeness(exam):
+        fields = (exam.exam_date, exam.application_start, exam.application_end, exam.official_link)
+        return (sum(value is not None for value in fields), -exam.id)
+
+    canonical = max(exams, key=completeness)
+    duplicates = [exam for exam in exams if exam.id != canonical.id]
+
+    for duplicate in duplicates:
+        for field in ('exam_date', 'application_start', 'application_end', 'official_link', 'source_url'):
+            if getattr(canonical, field) is None and getattr(duplicate, field) is not None:
+                setattr(canonical, field, getattr(duplicate, field))
+        if canonical.conducting_body == 'OTHER' and duplicate.conducting_body != 'OTHER':
+            canonical.conducting_body = duplicate.conducting_body
+
+        sources = session.query(ExamSource).filter(ExamSource.exam_id == duplicate.id).all()
+        for source in sources:
+            source.exam_id = canonical.id
+        if not sources:
+            # Rows written before provenance was tracked
+            session.add(ExamSource(
+                exam_id=canonical.id,
+                exam_name=duplicate.exam_name,
+                conducting_body=duplicate.conducting_body,
+                source_url=duplicate.source_url,
+                official_link=duplicate.official_link,
+                seen_at=duplicate.updated_at or datetime.now()
+            ))
+        record_exam_change(session, duplicate, 'delete')
+        session.delete(duplicate)
+
+    canonical.updated_at = datetime.now()
+    record_exam_change(session, canonical, 'update')
+    logger.info(f"Merged {len(duplicates)} duplicate(s) into exam {canonical.id}: {canonical.exam_name}")
+    return len(duplicates)
+
+def resolve_duplicates(batch_size=1000):
+    """
+    Find exams reported under different titles by different sources and
+    merge them. Returns the number of duplicate rows removed.
+
+    Writes through Session, so run it inside a staged ingest to have the
+    result validated and published as a new generation.
+    """
+    session = Session()
+    try:
+        records = {}
+        rows = session.query(
+            Exam.id, Exam.exam_name, Exam.conducting_body, Exam.exam_date
+        ).yield_per(batch_size)
+        for exam_id, exam_name, conducting_body, exam_date in rows:
+            records[exam_id] = {
+                'tokens': title_tokens(exam_name),
+                'conducting_body': conducting_body,
+                'exam_date': exam_date
+            }
+
+        groups = find_duplicate_groups(records)
+        logger.info(f"Found {len(groups)} duplicate groups among {len(records)} exams")
+
+        merged = 0
+        for group in groups:
+            merged += merge_group(session, group)
+        session.commit()
+
+        logger.info(f"Duplicate resolution removed {merged} rows")
+        return merged
+    except Exception as e:
+        logger.error(f"Error resolving duplicate exams: {str(e)}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with staged_ingest():
+        resolve_duplicates()
@@ -0,0 +1,118 @@
+import asyncio
+from collections import deque
+import orjson
+
+# Messages a client may have waiting before it counts as too slow and is
+# disconnected; it reconnects with Last-Event-ID and catches up from the
+# change log instead of holding server memory
+CLIENT_BUFFER_SIZE = 64
+
+# How long browsers wait before reconnecting a dropped stream
+RETRY_MS = 3000
+
+def change_events(changes):
+    """Change-log entries as one block of SSE events (id = change seq, event = operation)"""
+    return b"".join(
+        b"id: %d\nevent: %s\ndata: %s\n\n" % (change["seq"], change["operation"].encode(), orjson.dumps(change))
+        for change in changes
+    )
+
+def control_event(event, data):
+    return b"event: %s\ndata: %s\n\n" % (event.encode(), orjson.dumps(data))
+
+# Comment line that keeps idle connections (and proxies in between) open
+HEARTBEAT = b": keepalive\n\n"
+
+class Subscriber:
+    __slots__ = ('buffer', 'wakeup', 'dropped', 'after_seq')
+
+    def __init__(self):
+        self.buffer = deque()
+        self.wakeup = asyncio.Event()
+        self.dropped = False
+        # Change events up to this seq were already replayed to the client
+        self.after_seq = 0
+
+class Broadcaster:
+    """
+    Fans messages out to every connected event-stream client. A message is
+    encoded once and the same bytes are queued for every client, so
+    publishing costs one append per client and never waits on a socket.
+    A client whose buffer is full is dropped rather than buffered without
+    bound.
+    """
+
+    def __init__(self, buffer_size=CLIENT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.subscribers = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, message, events=None):
+        """
+        Queue message for every client. For change events, events holds
+        (seq, encoded event) for each change in message, oldest first, so a
+        client that already replayed some of them gets only the rest.
+        """
+        self.published += 1
+        for subscriber in list(self.subscribers):
+            if len(subscriber.buffer) >= self.buffer_size:
+                self.dropped += 1
+                self.end(subscriber)
+                continue
+            subscriber.buffer.append((events, message))
+            subscriber.wakeup.set()
+
+    def publish_changes(self, changes):
+        """Queue change-log entries (oldest first) as one message"""
+        events = [(change["seq"], change_events((change,))) for change in changes]
+        self.publish(b"".join(event for _, event in events), events)
+
+    def end(self, subscriber):
+        """Finish a subscriber's stream, discarding anything still queued for it"""
+        self.subscribers.discard(subscriber)
+        subscriber.dropped = True
+        subscriber.buffer.clear()
+        subscriber.wakeup.set()
+
+    async def messages(self, subscriber):
+        """Yield what is published for a subscriber until it is dropped"""
+        while True:
+            if not subscriber.buffer:
+                if subscriber.dropped:
+                    return
+                subscriber.wakeup.clear()
+                await subscriber.wakeup.wait()
+                continue
+            # Send everything waiting in one write
+            chunks = []
+            while subscriber.buffer:
+                events, message = subscriber.buffer.popleft()
+                if events is None or events[0][0] > subscriber.after_seq:
+                    chunks.append(message)
+                elif events[-1][0] > subscriber.after_seq:
+                    # Published while the client's replay was read; skip what it already got
+                    chunks.extend(event for seq, event in events if seq > subscriber.after_seq)
+            if chunks:
+                yield b"".join(chunks)
+
+    def close(self):
+        """End every stream (at shutdown)"""
+        for subscriber in list(self.subscribers):
+            self.end(subscriber)
+
+    def stats(self):
+        return {
+            "clients": len(self.subscribers),
+            "buffered_messages": sum(len(subscriber.buffer) for subscriber in self.subscribers),
+            "published": self.published,
+            "dropped": self.dropped
+        }
@@ -0,0 +1,141 @@
+import csv
+import importlib.util
+import io
+import orjson
+
+# Parquet exports are optional. pyarrow takes longer to import than all of the
+# app's own modules together, so it is only loaded by the first Parquet export
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Export formats: name -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+ACCEPTED_EXPORT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+    "application/vnd.apache.parquet": "parquet",
+}
+
+# Parquet row groups are written once this many rows are buffered: large
+# enough for good compression and fast column reads, small enough to keep
+# memory flat (a few MB)
+PARQUET_ROW_GROUP_SIZE = 50000
+
+# Parquet column types for export fields that aren't strings
+PARQUET_TYPES = {
+    "id": "int64",
+    "date": "date32",
+    "app_start": "date32",
+    "app_end": "date32",
+    "created_at": "timestamp",
+    "updated_at": "timestamp",
+}
+
+def negotiate_export_format(accept=None, format=None):
+    """
+    Pick an export format from an explicit ?format= or the Accept header;
+    defaults to NDJSON. Raises ValueError for a format that isn't available.
+    """
+    if not format:
+        for part in (accept or '').split(','):
+            format = ACCEPTED_EXPORT_TYPES.get(part.split(';')[0].strip().lower())
+            if format:
+                break
+        else:
+            format = "ndjson"
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format}'. Available: {', '.join(EXPORT_FORMATS)}")
+    if format == "parquet" and not PARQUET_AVAILABLE:
+        raise ValueError("Parquet support is not installed")
+    return format
+
+def ndjson_chunks(fields, batches):
+    for rows in batches:
+        yield b"".join(orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+def csv_chunks(fields, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+class ChunkSink(io.RawIOBase):
+    """A write-only file that hands over what was written since the last take()"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def parquet_schema(fields):
+    import pyarrow
+    types = {
+        "int64": pyarrow.int64(),
+        "date32": pyarrow.date32(),
+        "timestamp": pyarrow.timestamp('s'),
+    }
+    return pyarrow.schema([(field, types.get(PARQUET_TYPES.get(field), pyarrow.string())) for field in fields])
+
+def column_array(values, type):
+    import pyarrow
+    if pyarrow.types.is_date(type) or pyarrow.types.is_timestamp(type):
+        # Dates and timestamps arrive as ISO strings; Arrow parses them
+        return pyarrow.array(values, pyarrow.string()).cast(type)
+    return pyarrow.array(values, type)
+
+def parquet_chunks(fields, batches):
+    import pyarrow.parquet
+    schema = parquet_schema(fields)
+    sink = ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+
+    def write(rows):
+        columns = [column_array(column, field.type) for column, field in zip(zip(*rows), schema)]
+        writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+
+    pending = []
+    for rows in batches:
+        pending.extend(rows)
+        if len(pending) >= PARQUET_ROW_GROUP_SIZE:
+            write(pending)
+            pending = []
+            yield sink.take()
+    if pending:
+        write(pending)
+    writer.close()
+    yield sink.take()
+
+def export_chunks(format, fields, batches):
+    """Encode batches of row tuples as byte chunks of the export format"""
+    if format == "csv":
+        return csv_chunks(fields, batches)
+    if format == "parquet":
+        return parquet_chunks(fields, batches)
+    return ndjson_chunks(fields, batches)
@@ -0,0 +1,115 @@
+from datetime import timedelta, timezone
+
+from queries import MONTH_ABBREVIATIONS
+
+# iCalendar (RFC 5545) feeds of exam dates and application windows, for
+# subscribing from calendar apps
+
+PRODID = "-//Government Exam Calendar//Exam Feeds//EN"
+UID_DOMAIN = "govt-exam-calendar"
+
+# How often subscribed clients are asked to poll (they may poll more often;
+# unchanged feeds are answered with 304)
+REFRESH_INTERVAL = "PT1H"
+
+def escape_text(value):
+    """Escape a TEXT property value"""
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+def fold(line):
+    """Split a content line into 75-octet lines, never inside a UTF-8 character"""
+    if len(line) <= 75 and line.isascii():
+        return line
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80:  # continuation byte
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+        limit = 74  # continuation lines start with a space
+    parts.append(data)
+    return '\r\n '.join(part.decode('utf-8') for part in parts)
+
+# Dates are formatted by hand: strftime dominates building a large feed
+
+def ics_date(value):
+    return f"{value.year:04d}{value.month:02d}{value.day:02d}"
+
+def display_date(value):
+    """strftime('%d %b %Y')"""
+    return f"{value.day:02d} {MONTH_ABBREVIATIONS[value.month]} {value.year:04d}"
+
+def all_day_event(uid, stamp, start, end, summary, description, link, category):
+    """Lines of an all-day VEVENT covering the days start..end inclusive"""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{UID_DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{ics_date(start)}",
+        f"DTEND;VALUE=DATE:{ics_date(end + timedelta(days=1))}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"DESCRIPTION:{escape_text(description)}",
+        f"CATEGORIES:{escape_text(category)}",
+        "TRANSP:TRANSPARENT",
+    ]
+    if link:
+        lines.append(f"URL:{link}")
+    lines.append("END:VEVENT")
+    return lines
+
+def exam_events(exam, stamp):
+    """
+    Events for one exam: the exam day, and the application window when both
+    its ends are known. exam is (id, name, body, exam date, application
+    start, application end, link) with datetime or None values.
+    """
+    exam_id, name, body, exam_date, app_start, app_end, link = exam
+    window = None
+    if app_start is not None and app_end is not None:
+        window = f"{display_date(app_start)} - {display_date(app_end)}"
+
+    lines = []
+    if exam_date is not None:
+        description = f"Conducting body: {body}\nApplications: {window or 'Not Available'}"
+        if link:
+            description += f"\nOfficial notification: {link}"
+        lines += all_day_event(f"exam-{exam_id}", stamp, exam_date, exam_date, name, description, link, body)
+    if window is not None:
+        description = f"Conducting body: {body}\nExam date: {display_date(exam_date) if exam_date else 'TBA'}"
+        if link:
+            description += f"\nOfficial notification: {link}"
+        lines += all_day_event(
+            f"exam-{exam_id}-applications", stamp, app_start, app_end, f"Applications open: {name}",
+            description, link, body
+        )
+    return lines
+
+def calendar_feed(exams, name, stamp):
+    """
+    A complete VCALENDAR for exams (see exam_events), as bytes. stamp is the
+    DTSTAMP of every event (when the data was published), so the same data
+    always gives the same feed.
+    """
+    stamp = stamp.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{REFRESH_INTERVAL}",
+        f"X-PUBLISHED-TTL:{REFRESH_INTERVAL}",
+    ]
+    for exam in exams:
+        lines += exam_events(exam, stamp)
+    lines.append("END:VCALENDAR")
+    return ('\r\n'.join(map(fold, lines)) + '\r\n').encode('utf-8')
@@ -0,0 +1,75 @@
+import sys
+from bisect import bisect_left, bisect_right
+
+class IntervalTree:
+    """
+    Static centered interval tree over closed intervals [start, end].
+
+    Each node keeps the intervals containing its center point, sorted by
+    start and (separately) by end; intervals entirely left or right of it
+    go to the child subtrees. A stabbing query walks one root-to-leaf path
+    and only touches intervals it returns, so it runs in O(log n + k).
+    """
+    __slots__ = ('center', 'starts', 'by_start', 'ends', 'by_end', 'left', 'right')
+
+    def __init__(self, intervals):
+        """intervals: iterable of (start, end, value) with start <= end"""
+        intervals = list(intervals)
+        self.left = self.right = None
+        self.center = None
+        if not intervals:
+            self.starts = self.by_start = self.ends = self.by_end = []
+            return
+
+        endpoints = sorted(point for start, end, _ in intervals for point in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        here_by_start = sorted(here, key=lambda interval: interval[0])
+        here_by_end = sorted(here, key=lambda interval: interval[1])
+        self.starts = [interval[0] for interval in here_by_start]
+        self.by_start = [interval[2] for interval in here_by_start]
+        self.ends = [interval[1] for interval in here_by_end]
+        self.by_end = [interval[2] for interval in here_by_end]
+        if left:
+            self.left = IntervalTree(left)
+        if right:
+            self.right = IntervalTree(right)
+
+    def stab(self, point):
+        """Values of every interval containing point"""
+        found = []
+        node = self
+        while node is not None and node.center is not None:
+            if point < node.center:
+                # Intervals here all end at or after center > point
+                found.extend(node.by_start[:bisect_right(node.starts, point)])
+                node = node.left
+            elif point > node.center:
+                # Intervals here all start at or before center < point
+                found.extend(node.by_end[bisect_left(node.ends, point):])
+                node = node.right
+            else:
+                found.extend(node.by_start)
+                break
+        return found
+
+    def memory_usage(self):
+        """Approximate bytes held by the tree's nodes and lists (not the values)"""
+        total = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            total += sys.getsizeof(node) + sum(
+                sys.getsizeof(items) for items in (node.starts, node.by_start, node.ends, node.by_end)
+            )
+            stack.extend(child for child in (node.left, node.right) if child is not None)
+        return total
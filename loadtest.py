@@ -0,0 +1,95 @@
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Mix of endpoints roughly matching real traffic: mostly calendar months,
+# some searches, and the stats query that used to stall everything else.
+DEFAULT_PATHS = [
+    "/exams/month/2025/6",
+    "/exams/month/2025/7?conducting_body=SSC",
+    "/api/exams/search?q=Exam&days=3650",
+    "/api/stats",
+    "/",
+]
+
+def worker(host, port, paths, deadline, latencies, errors, lock):
+    """Send requests over one keep-alive connection until the deadline"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    local_latencies = []
+    local_errors = 0
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+        except Exception:
+            local_errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+def run_load_test(base_url, clients=200, duration=20.0, paths=None):
+    """Run `clients` concurrent connections for `duration` seconds and summarize"""
+    parts = urlsplit(base_url)
+    paths = paths or DEFAULT_PATHS
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(parts.hostname, parts.port or 80, paths[i % len(paths):] + paths[:i % len(paths)], deadline, latencies, errors, lock)
+        )
+        for i in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test for the exam calendar API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running server")
+    parser.add_argument("--clients", type=int, default=200, help="Number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="Test length in seconds")
+    parser.add_argument("--path", action="append", help="Path to request (repeatable); defaults to a mixed workload")
+    args = parser.parse_args()
+
+    result = run_load_test(args.url, args.clients, args.duration, args.path)
+    print(f"Clients:    {args.clients}")
+    print(f"Requests:   {result['requests']} ({result['errors']} errors)")
+    print(f"Throughput: {result['throughput_rps']:.1f} req/s")
+    print(f"Latency:    p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, mean {result['mean_ms']:.1f} ms")
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+# Holds thousands of idle /api/events/stream connections open against a
+# running server, then (with --trigger) commits one exam change and measures
+# how long it takes to reach every client.
+
+async def open_stream(host, port, path, connected):
+    """Connect, read the response headers, and return the stream"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise RuntimeError(f"Unexpected response: {status!r}")
+    await reader.readuntil(b"\r\n\r\n")
+    connected.append(time.perf_counter())
+    return reader, writer
+
+async def wait_for_change(reader, received):
+    """Read until the first change event arrives and record when"""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        if b"event: insert" in line or b"event: update" in line:
+            received.append(time.perf_counter())
+            return
+
+def trigger_change():
+    """Commit one exam change through the normal ingestion helper (run from the server's directory)"""
+    from db import add_or_update_exam
+    now = datetime.now()
+    add_or_update_exam({
+        "exam_name": f"Event stream load test {now.isoformat()}",
+        "conducting_body": "OTHER",
+        "exam_date": now + timedelta(days=30),
+        "application_start": None,
+        "application_end": None,
+        "official_link": None,
+        "source_url": None,
+    })
+
+def server_stats(host, port):
+    import http.client
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    connection.request("GET", "/api/debug/events")
+    return json.loads(connection.getresponse().read())
+
+async def run(base_url, clients, hold, trigger, batch):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    connected = []
+    started = time.perf_counter()
+    streams = []
+    # Connect in batches so the listen backlog isn't overrun
+    for first in range(0, clients, batch):
+        results = await asyncio.gather(
+            *(open_stream(host, port, "/api/events/stream", connected) for _ in range(first, min(first + batch, clients))),
+            return_exceptions=True
+        )
+        streams += [result for result in results if not isinstance(result, BaseException)]
+    print(f"Connected:  {len(streams)}/{clients} streams in {time.perf_counter() - started:.1f} s")
+
+    stats = await asyncio.to_thread(server_stats, host, port)
+    print(f"Server:     {stats['clients']} clients, {stats['dropped']} dropped")
+
+    received = []
+    waiters = [asyncio.create_task(wait_for_change(reader, received)) for reader, _ in streams]
+    if trigger:
+        sent = time.perf_counter()
+        await asyncio.to_thread(trigger_change)
+        await asyncio.wait(waiters, timeout=hold)
+        latencies = sorted(at - sent for at in received)
+        if latencies:
+            print(f"Delivered:  {len(latencies)}/{len(streams)} clients; "
+                  f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms "
+                  f"(includes up to one poll interval)")
+        else:
+            print("Delivered:  0 clients")
+    else:
+        await asyncio.sleep(hold)
+
+    for waiter in waiters:
+        waiter.cancel()
+    for _, writer in streams:
+        writer.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Idle-connection load test for the event stream")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running server")
+    parser.add_argument("--clients", type=int, default=5000, help="Number of event-stream connections")
+    parser.add_argument("--hold", type=float, default=10.0, help="Seconds to hold the connections (or wait for delivery)")
+    parser.add_argument("--trigger", action="store_true", help="Commit one exam change and time its delivery")
+    parser.add_argument("--batch", type=int, default=500, help="Connections opened at a time")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.clients, args.hold, args.trigger, args.batch))
@@ -0,0 +1,219 @@
+import time
+from bisect import bisect_left
+
+# Request metrics in Prometheus text format. Everything is recorded on the
+# event loop thread, so plain counters need no locking.
+
+# Latency histogram bucket bounds, in seconds
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Response size histogram bucket bounds, in bytes (full mode only)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Label for requests that matched no API route (static files, 404s)
+UNMATCHED_ROUTE = "other"
+
+# full: per-route response size histograms as well as the rest.
+# light: no size histograms; sizes are only summed per route, taken from
+# Content-Length so body messages aren't inspected, which keeps the cost
+# of streamed responses (exports, event streams) flat. Streamed responses
+# have no Content-Length and count as 0 bytes.
+METRICS_MODES = ("full", "light", "off")
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One slot per bound plus one for values above the last bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket, like PromQL's histogram_quantile"""
+        total = sum(self.counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+class RouteStats:
+    __slots__ = ('statuses', 'durations', 'sizes', 'bytes', 'queries', 'sql_seconds')
+
+    def __init__(self, full):
+        self.statuses = {}
+        self.durations = Histogram(DURATION_BUCKETS)
+        self.sizes = Histogram(SIZE_BUCKETS) if full else None
+        self.bytes = 0
+        self.queries = 0
+        self.sql_seconds = 0
+
+class Metrics:
+    """Per-route request counts by status, latency, response sizes and SQL, plus requests in flight"""
+
+    def __init__(self, mode="full"):
+        if mode not in METRICS_MODES:
+            raise ValueError(f"Unknown metrics mode '{mode}'. Available: {', '.join(METRICS_MODES)}")
+        self.mode = mode
+        self.full = mode == "full"
+        self.routes = {}
+        self.in_flight = 0
+
+    def record(self, route, method, status, duration, size, queries=0, sql_seconds=0):
+        stats = self.routes.get((route, method))
+        if stats is None:
+            stats = self.routes[(route, method)] = RouteStats(self.full)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.durations.observe(duration)
+        stats.bytes += size
+        stats.queries += queries
+        stats.sql_seconds += sql_seconds
+        if stats.sizes is not None:
+            stats.sizes.observe(size)
+
+    def latency(self):
+        """p50/p95/p99 latency estimates per route, in milliseconds"""
+        result = {}
+        for (route, method), stats in sorted(self.routes.items()):
+            durations = stats.durations
+            result[f"{method} {route}"] = {
+                "requests": sum(durations.counts),
+                **{
+                    f"p{round(q * 100)}_ms": round(durations.quantile(q) * 1000, 2)
+                    for q in (0.5, 0.95, 0.99)
+                }
+            }
+        return result
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP http_requests_total Requests handled, by route, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        routes = sorted(self.routes.items())
+        for (route, method), stats in routes:
+            labels = f'route="{escape_label(route)}",method="{method}"'
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from receiving a request to sending its last byte.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (route, method), stats in routes:
+            histogram_lines(lines, "http_request_duration_seconds", f'route="{escape_label(route)}",method="{method}"', stats.durations)
+
+        lines += [
+            "# HELP http_response_bytes_total Response body bytes sent (after compression).",
+            "# TYPE http_response_bytes_total counter",
+        ]
+        for (route, method), stats in routes:
+            lines.append(f'http_response_bytes_total{{route="{escape_label(route)}",method="{method}"}} {stats.bytes}')
+
+        lines += [
+            "# HELP http_request_sql_queries_total SQL statements run while handling requests.",
+            "# TYPE http_request_sql_queries_total counter",
+        ]
+        for (route, method), stats in routes:
+            lines.append(f'http_request_sql_queries_total{{route="{escape_label(route)}",method="{method}"}} {stats.queries}')
+        lines += [
+            "# HELP http_request_sql_seconds_total Time spent executing those statements.",
+            "# TYPE http_request_sql_seconds_total counter",
+        ]
+        for (route, method), stats in routes:
+            lines.append(f'http_request_sql_seconds_total{{route="{escape_label(route)}",method="{method}"}} {stats.sql_seconds}')
+
+        if self.full:
+            lines += [
+                "# HELP http_response_size_bytes Response body size (after compression).",
+                "# TYPE http_response_size_bytes histogram",
+            ]
+            for (route, method), stats in routes:
+                histogram_lines(lines, "http_response_size_bytes", f'route="{escape_label(route)}",method="{method}"', stats.sizes)
+
+        lines += [
+            "# HELP http_requests_in_flight Requests being handled, including open streams.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        return ("\n".join(lines) + "\n").encode()
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def histogram_lines(lines, name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    cumulative += histogram.counts[-1]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+    lines.append(f'{name}_count{{{labels}}} {cumulative}')
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and records it under its route template (for
+    example /exams/month/{year}/{month}), so the number of series stays
+    bounded whatever paths clients ask for.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.metrics.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500
+        size = 0
+
+        if metrics.full:
+            async def send_counted(message):
+                nonlocal status, size
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                elif message["type"] == "http.response.body":
+                    size += len(message.get("body", b""))
+                await send(message)
+        else:
+            async def send_counted(message):
+                nonlocal status, size
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    for name, value in message["headers"]:
+                        if name == b"content-length":
+                            size = int(value)
+                            break
+                await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            # Left by QueryProfilerMiddleware, when installed inside this one
+            queries = scope.get("query_stats")
+            metrics.record(
+                route.path if route is not None else UNMATCHED_ROUTE, scope["method"], status,
+                time.perf_counter() - started, size,
+                queries.count if queries is not None else 0, queries.total if queries is not None else 0
+            )
@@ -0,0 +1,448 @@
+import base64
+import json
+import re
+from datetime import date, datetime, timedelta
+from sqlalchemy import DateTime, Float, Integer, and_, case, func, literal, or_, text
+from db import Exam, ExamChange, ExamStat, get_exam_changes
+from serialization import Rows
+from clashes import DEFAULT_GAP_DAYS, clash_report, heavy_weeks, sweep, week_start
+
+# Read queries behind the API endpoints. Each takes an open SQLAlchemy
+# session and returns plain Python data, so it can run on a worker thread
+# without any ORM objects leaking back to the event loop.
+
+def month_bounds(year, month):
+    """Return the [start, end) datetimes of a calendar month"""
+    start_date = datetime(year, month, 1)
+    if month == 12:
+        end_date = datetime(year + 1, 1, 1)
+    else:
+        end_date = datetime(year, month + 1, 1)
+    return start_date, end_date
+
+def encode_cursor(values):
+    """Pack the sort key of the last row on a page into an opaque cursor"""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, order):
+    """Unpack a cursor made by encode_cursor for the given order; raises ValueError if it doesn't fit"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(order):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if value is not None and isinstance(column.type, DateTime) else value
+            for column, value in zip(order, values)
+        ]
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def keyset_after(order, values):
+    """
+    Condition selecting rows that sort strictly after `values` in ascending
+    `order`, treating NULL as the smallest value like SQLite does
+    """
+    conditions = []
+    for i, (column, value) in enumerate(zip(order, values)):
+        same_prefix = [
+            earlier.is_(None) if earlier_value is None else earlier == earlier_value
+            for earlier, earlier_value in zip(order[:i], values[:i])
+        ]
+        after = column.isnot(None) if value is None else column > value
+        conditions.append(and_(*same_prefix, after))
+    return or_(*conditions)
+
+def page_of(query, order, cursor=None, limit=100):
+    """
+    Return (rows, next_cursor) for one page of a column query in `order`,
+    resuming after `cursor`. Pages are found by seeking on the sort key,
+    so every page costs the same however deep into the results it is.
+    """
+    width = len(query.column_descriptions)
+    if cursor:
+        query = query.filter(keyset_after(order, decode_cursor(cursor, order)))
+    rows = query.add_columns(*order).order_by(*order).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1][width:]) if len(rows) > limit else None
+    return [tuple(row[:width]) for row in rows[:limit]], next_cursor
+
+MONTH_ABBREVIATIONS = ('', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def day(column):
+    """A DateTime column as 'YYYY-MM-DD' text, taken from the stored value without a datetime round trip"""
+    return func.date(column)
+
+def display_date(value, fallback):
+    """'2025-06-01' -> '01 Jun 2025' (strftime's '%d %b %Y') by slicing"""
+    if not value:
+        return fallback
+    return f"{value[8:10]} {MONTH_ABBREVIATIONS[int(value[5:7])]} {value[:4]}"
+
+def body_counts(db, now):
+    """
+    Return (conducting_body, total, upcoming, this_month) rows in one GROUP BY
+    over the small materialized stats table, or over exams directly if the
+    stats haven't been built yet
+    """
+    today = now.strftime('%Y-%m-%d')
+    this_month = now.strftime('%Y-%m')
+
+    def aggregate(body, day, count):
+        # Exams are dated at midnight, so "on or after now" means after today
+        return db.query(
+            body,
+            func.sum(count),
+            func.sum(case((day > today, count), else_=0)),
+            func.sum(case((func.substr(day, 1, 7) == this_month, count), else_=0))
+        ).group_by(body)
+
+    rows = aggregate(ExamStat.conducting_body, ExamStat.exam_day, ExamStat.exam_count).all()
+    if rows:
+        return rows
+    exam_day = func.coalesce(func.date(Exam.exam_date), '')
+    return aggregate(Exam.conducting_body, exam_day, literal(1)).all()
+
+def summarize_stats(rows):
+    """Fold per-body counts into overall, upcoming, this-month and per-body stats"""
+    total_exams = 0
+    upcoming_exams = 0
+    this_month_exams = 0
+    body_stats = {}
+    for conducting_body, total, upcoming, this_month in rows:
+        if not total:
+            continue
+        total_exams += total
+        upcoming_exams += upcoming
+        this_month_exams += this_month
+        body_stats[conducting_body] = upcoming
+
+    return {
+        "total_exams": total_exams,
+        "upcoming_exams": upcoming_exams,
+        "this_month_exams": this_month_exams,
+        "body_stats": body_stats
+    }
+
+def index_page_data(db, conducting_body=None):
+    """Collect everything the main calendar page renders"""
+    now = datetime.now()
+
+    # Get upcoming exams (next 3 months)
+    upcoming_end_date = now + timedelta(days=90)
+    upcoming_query = db.query(Exam).filter(
+        Exam.exam_date >= now,
+        Exam.exam_date <= upcoming_end_date
+    ).order_by(Exam.exam_date)
+
+    # Apply conducting body filter if specified
+    if conducting_body:
+        upcoming_query = upcoming_query.filter(Exam.conducting_body == conducting_body)
+
+    upcoming_exams = upcoming_query.limit(20).all()  # Limit to 20 upcoming exams
+
+    # Conducting bodies for the filter dropdown and exam counts, in one lookup
+    stats = summarize_stats(body_counts(db, now))
+    conducting_bodies = sorted(stats["body_stats"])
+    total_exams = stats["total_exams"]
+    total_upcoming = stats["upcoming_exams"]
+
+    # Weeks from this one on where several exams share a date
+    this_week = datetime.combine(week_start(now.date()), datetime.min.time())
+    _, _, weeks = sweep(clash_candidates(db, conducting_body=conducting_body, start=this_week))
+
+    # Detach the loaded rows so the template can read them after the session closes
+    db.expunge_all()
+
+    return {
+        "exams": upcoming_exams,  # Use upcoming exams for the table
+        "conducting_bodies": conducting_bodies,
+        "selected_body": conducting_body,
+        "total_exams": total_exams,
+        "upcoming_exams": total_upcoming,
+        "clash_weeks": heavy_weeks(weeks, since=now.date())
+    }
+
+MONTH_EXAM_FIELDS = (
+    "id", "name", "date", "body", "link", "app_start", "app_end",
+    "app_start_formatted", "app_end_formatted", "exam_date_formatted"
+)
+
+def month_exams(db, year, month, conducting_body=None):
+    """Exams for one calendar month, in the calendar's event format"""
+    start_date, end_date = month_bounds(year, month)
+
+    query = db.query(
+        Exam.id, Exam.exam_name, day(Exam.exam_date), Exam.conducting_body,
+        Exam.official_link, day(Exam.application_start), day(Exam.application_end)
+    ).filter(
+        Exam.exam_date >= start_date,
+        Exam.exam_date < end_date
+    )
+
+    if conducting_body:
+        query = query.filter(Exam.conducting_body == conducting_body)
+
+    return Rows(MONTH_EXAM_FIELDS, [
+        (
+            exam_id, name, exam_date, body, link, app_start, app_end,
+            display_date(app_start, "Not Available"),
+            display_date(app_end, "Not Available"),
+            display_date(exam_date, "TBA")
+        )
+        for exam_id, name, exam_date, body, link, app_start, app_end in query
+    ])
+
+# A quoted phrase or a single unquoted word in the search box
+SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+def fts_match_expression(q):
+    """
+    Translate search box input into an FTS5 MATCH expression. Quoted text
+    is matched as a phrase and other words as prefixes ("ss" finds "SSC");
+    every term must match. Only word characters are passed through, so
+    user input can never inject FTS5 query syntax.
+    """
+    terms = []
+    for phrase, word in SEARCH_TERM.findall(q):
+        if phrase:
+            tokens = re.findall(r'\w+', phrase)
+            if tokens:
+                terms.append('"' + ' '.join(tokens) + '"')
+        else:
+            terms.extend(f'"{token}"*' for token in re.findall(r'\w+', word))
+    return ' AND '.join(terms)
+
+RANGE_EVENT_FIELDS = ("id", "title", "start", "body", "link", "app_start", "app_end")
+
+def range_events(db, start, end, conducting_body=None):
+    """
+    Exams dated in [start, end) as compact calendar events: only the
+    columns the calendar shows, read straight off the exam_date index
+    without loading ORM objects
+    """
+    query = db.query(
+        Exam.id, Exam.exam_name, day(Exam.exam_date), Exam.conducting_body,
+        Exam.official_link, day(Exam.application_start), day(Exam.application_end)
+    ).filter(
+        Exam.exam_date >= start,
+        Exam.exam_date < end
+    )
+
+    if conducting_body:
+        query = query.filter(Exam.conducting_body == conducting_body)
+
+    return Rows(RANGE_EVENT_FIELDS, [tuple(row) for row in query.order_by(Exam.exam_date, Exam.id)])
+
+# Application status of an exam on a given day, as shown in the calendar
+APPLICATION_STATUSES = ("open", "upcoming", "closed")
+APPLICATION_FIELDS = ("id", "name", "date", "body", "link", "app_start", "app_end")
+
+def application_query(db, conducting_body=None):
+    """Exams with both application dates, as APPLICATION_FIELDS columns"""
+    query = db.query(
+        Exam.id, Exam.exam_name, day(Exam.exam_date), Exam.conducting_body,
+        Exam.official_link, day(Exam.application_start), day(Exam.application_end)
+    ).filter(
+        Exam.application_start.isnot(None),
+        Exam.application_end.isnot(None)
+    )
+    if conducting_body:
+        query = query.filter(Exam.conducting_body == conducting_body)
+    return query
+
+def applications_by_status(db, on, status="open", conducting_body=None, limit=100):
+    """
+    Exams whose applications are open on `on` (soonest deadline first), not
+    yet open (soonest opening first) or closed (latest deadline first)
+    """
+    on_day = on.isoformat()
+    app_start, app_end = day(Exam.application_start), day(Exam.application_end)
+    query = application_query(db, conducting_body)
+    if status == "open":
+        query = query.filter(app_start <= on_day, app_end >= on_day)
+        order = [app_end, Exam.id]
+    elif status == "upcoming":
+        query = query.filter(app_start > on_day)
+        order = [app_start, Exam.id]
+    else:
+        query = query.filter(app_end < on_day)
+        order = [app_end.desc(), Exam.id.desc()]
+
+    rows = query.order_by(*order).limit(limit).all()
+    return {"exams": Rows(APPLICATION_FIELDS, [tuple(row) for row in rows]), "total": query.count()}
+
+def applications_closing(db, on, within=7, status=None, conducting_body=None, limit=100):
+    """Exams whose application deadline falls within `within` days of `on`, soonest first"""
+    on_day = on.isoformat()
+    until_day = (on + timedelta(days=within)).isoformat()
+    app_start, app_end = day(Exam.application_start), day(Exam.application_end)
+    query = application_query(db, conducting_body).filter(app_end >= on_day, app_end <= until_day)
+    if status == "open":
+        query = query.filter(app_start <= on_day)
+    elif status == "upcoming":
+        query = query.filter(app_start > on_day)
+
+    rows = query.order_by(app_end, Exam.id).limit(limit).all()
+    return {"exams": Rows(APPLICATION_FIELDS, [tuple(row) for row in rows]), "total": query.count()}
+
+def clash_candidates(db, ids=None, conducting_body=None, start=None, end=None):
+    """Dated exams as (id, name, body, day) tuples sorted by (exam_date, id)"""
+    query = db.query(
+        Exam.id, Exam.exam_name, Exam.conducting_body, day(Exam.exam_date)
+    ).filter(Exam.exam_date.isnot(None))
+    if ids:
+        query = query.filter(Exam.id.in_(ids))
+    if conducting_body:
+        query = query.filter(Exam.conducting_body == conducting_body)
+    if start:
+        query = query.filter(Exam.exam_date >= start)
+    if end:
+        query = query.filter(Exam.exam_date < end)
+    return [
+        (exam_id, name, body, date.fromisoformat(exam_day))
+        for exam_id, name, body, exam_day in query.order_by(Exam.exam_date, Exam.id)
+    ]
+
+def exam_clashes(db, ids=None, conducting_body=None, start=None, end=None, gap_days=DEFAULT_GAP_DAYS, limit=100):
+    """Same-day clashes, tight gaps and clash-heavy weeks among the selected exams"""
+    return clash_report(clash_candidates(db, ids, conducting_body, start, end), gap_days, limit)
+
+def search_matches(expression):
+    """Subquery of (exam_id, rank) for exams matching an FTS5 expression, best first"""
+    # bm25 weights: a hit in the exam name counts most, then body, then source
+    return text(
+        "SELECT rowid AS exam_id, bm25(exams_fts, 10.0, 5.0, 1.0) AS rank "
+        "FROM exams_fts WHERE exams_fts MATCH :expression"
+    ).bindparams(expression=expression).columns(exam_id=Integer, rank=Float).subquery()
+
+SEARCH_FIELDS = ("id", "name", "date", "body", "link", "app_start", "app_end")
+
+def search_query(db, columns, q=None, conducting_body=None, days=None):
+    """
+    Query for columns of the exams matching the search filters: text,
+    body and upcoming window (days ahead of now). Returns (query, order),
+    or (None, None) when q holds nothing searchable.
+    """
+    query = db.query(*columns)
+    order = [Exam.exam_date, Exam.id]
+
+    # Apply date filter
+    if days:
+        end_date = datetime.now() + timedelta(days=days)
+        query = query.filter(
+            Exam.exam_date >= datetime.now(),
+            Exam.exam_date <= end_date
+        )
+
+    # Apply conducting body filter
+    if conducting_body:
+        query = query.filter(Exam.conducting_body == conducting_body)
+
+    # Apply text search
+    if q:
+        expression = fts_match_expression(q)
+        if not expression:
+            return None, None
+        matches = search_matches(expression)
+        query = query.join(matches, matches.c.exam_id == Exam.id)
+        order = [matches.c.rank] + order
+
+    return query, order
+
+def search_exams(db, q=None, conducting_body=None, days=90, cursor=None, limit=100):
+    """
+    One page of exams matching name, body and upcoming window, ordered by
+    date. Text queries use the full-text index and are ordered by
+    relevance first.
+    """
+    query, order = search_query(
+        db,
+        (Exam.id, Exam.exam_name, day(Exam.exam_date), Exam.conducting_body,
+         Exam.official_link, day(Exam.application_start), day(Exam.application_end)),
+        q, conducting_body, days
+    )
+    if query is None:
+        return {"exams": Rows(SEARCH_FIELDS, []), "next_cursor": None, "has_more": False}
+
+    exams, next_cursor = page_of(query, order, cursor, limit)
+
+    return {
+        "exams": Rows(SEARCH_FIELDS, exams),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+
+EXPORT_FIELDS = SEARCH_FIELDS + ("created_at", "updated_at")
+
+def timestamp(column):
+    """An ISO 8601 timestamp string for a datetime column, computed by SQLite"""
+    return func.strftime('%Y-%m-%dT%H:%M:%S', column)
+
+def export_batches(db, q=None, conducting_body=None, days=None, batch_size=1000):
+    """
+    Every exam matching the search filters, ordered by date, as lists of
+    row tuples (EXPORT_FIELDS) of at most batch_size. Rows are read from
+    the cursor as they are needed, so memory use doesn't grow with the
+    table.
+    """
+    query, _ = search_query(
+        db,
+        (Exam.id, Exam.exam_name, day(Exam.exam_date), Exam.conducting_body,
+         Exam.official_link, day(Exam.application_start), day(Exam.application_end),
+         timestamp(Exam.created_at), timestamp(Exam.updated_at)),
+        q, conducting_body, days
+    )
+    if query is None:
+        return
+    statement = query.order_by(Exam.exam_date, Exam.id).statement
+    result = db.execute(statement, execution_options={"yield_per": batch_size})
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+def feed_exams(db, conducting_body=None):
+    """
+    Exams for a calendar feed, ordered by id: every exam with a date or a
+    complete application window, as (id, name, body, exam date, application
+    start, application end, link)
+    """
+    query = db.query(
+        Exam.id, Exam.exam_name, Exam.conducting_body, Exam.exam_date,
+        Exam.application_start, Exam.application_end, Exam.official_link
+    ).filter(or_(
+        Exam.exam_date.isnot(None),
+        and_(Exam.application_start.isnot(None), Exam.application_end.isnot(None))
+    ))
+    if conducting_body:
+        query = query.filter(Exam.conducting_body == conducting_body)
+    return [tuple(row) for row in query.order_by(Exam.id)]
+
+def exam_stats(db):
+    """Exam counts overall, upcoming, this month and per conducting body"""
+    return summarize_stats(body_counts(db, datetime.now()))
+
+def latest_change_seq(db):
+    """The newest change-log cursor, or 0 for an empty log"""
+    return db.query(func.max(ExamChange.seq)).scalar() or 0
+
+def exam_changes_page(db, since=0, limit=500):
+    """One page of the change log after a cursor"""
+    changes = get_exam_changes(since=since, limit=limit + 1, session=db)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return {
+        "changes": changes,
+        "next_cursor": changes[-1]["seq"] if changes else since,
+        "has_more": has_more
+    }
+
+def all_exams(db, cursor=None, limit=100):
+    """One page of every exam, ordered by date"""
+    query = db.query(Exam.id, Exam.exam_name, day(Exam.exam_date), Exam.conducting_body, Exam.official_link)
+    exams, next_cursor = page_of(query, [Exam.exam_date, Exam.id], cursor, limit)
+    return {
+        "exams": Rows(("id", "name", "date", "body", "link"), exams),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
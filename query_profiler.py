@@ -0,0 +1,188 @@
+import logging
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Counts and times the SQL each request runs. Statements are timed around
+# cursor.execute, which for SQLite covers planning and stepping to the first
+# row; fetching the remaining rows is not included.
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged
+SLOW_QUERY_SECONDS = 0.1
+
+# Distinct statements tracked since startup for /api/debug/queries. The
+# statements come from the code, so this is only reached if something
+# generates SQL text dynamically
+MAX_TRACKED_STATEMENTS = 1000
+
+# Slowest statements reported for each request that goes over its budget
+SLOWEST_REPORTED = 5
+
+# The queries of the request being handled. Database threads see it because
+# run_db and stream_db run their work in a copy of the request's context
+current_queries = ContextVar("current_queries", default=None)
+
+class QueryStats:
+    """The queries one request ran: how many, their total time, and each distinct statement"""
+    __slots__ = ('count', 'total', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        # statement -> [executions, total seconds, slowest seconds]
+        self.statements = {}
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total += duration
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, duration, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+            if duration > entry[2]:
+                entry[2] = duration
+
+    def slowest(self, n=SLOWEST_REPORTED):
+        """[(statement, executions, total seconds, slowest seconds)], slowest single execution first"""
+        return [
+            (statement, *entry)
+            for statement, entry in sorted(self.statements.items(), key=lambda item: -item[1][2])[:n]
+        ]
+
+    def report(self, n=SLOWEST_REPORTED):
+        lines = [f"{self.count} queries, {self.total * 1000:.1f} ms"]
+        for statement, executions, total, slowest in self.slowest(n):
+            lines.append(
+                f"  {executions}x, {total * 1000:.1f} ms total, {slowest * 1000:.1f} ms slowest: {one_line(statement)}"
+            )
+        return "\n".join(lines)
+
+def one_line(statement):
+    return " ".join(statement.split())
+
+class QueryProfiler:
+    """
+    Hooks an engine's execute events and attributes each statement to the
+    request that ran it. Also keeps per-statement totals since startup and
+    logs statements slower than slow_query_seconds.
+    """
+
+    def __init__(self, slow_query_seconds=SLOW_QUERY_SECONDS, debug_header=False):
+        self.slow_query_seconds = slow_query_seconds
+        # Add a Server-Timing header with each response's query count and time
+        self.debug_header = debug_header
+        # statement -> [executions, total seconds, slowest seconds], over all requests
+        self.statements = {}
+        self.slow_queries = 0
+        # The most recently finished request's queries (used by assert_query_budget)
+        self.last_request = None
+
+    def install(self, engine):
+        event.listen(engine, "before_cursor_execute", self.before_execute)
+        event.listen(engine, "after_cursor_execute", self.after_execute)
+        event.listen(engine, "handle_error", self.execute_failed)
+
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        stats = current_queries.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration >= self.slow_query_seconds:
+            self.slow_queries += 1
+            logger.warning(f"Slow query ({duration * 1000:.1f} ms): {one_line(statement)}")
+
+    def execute_failed(self, context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    def finish(self, stats):
+        """Fold a finished request's queries into the totals since startup (on the event loop)"""
+        self.last_request = stats
+        for statement, (executions, total, slowest) in stats.statements.items():
+            entry = self.statements.get(statement)
+            if entry is None:
+                if len(self.statements) >= MAX_TRACKED_STATEMENTS:
+                    continue
+                self.statements[statement] = [executions, total, slowest]
+            else:
+                entry[0] += executions
+                entry[1] += total
+                if slowest > entry[2]:
+                    entry[2] = slowest
+
+    def stats(self, limit=20):
+        """The statements with the most total time since startup"""
+        ranked = sorted(self.statements.items(), key=lambda item: -item[1][1])[:limit]
+        return {
+            "statements_tracked": len(self.statements),
+            "slow_queries": self.slow_queries,
+            "slow_query_ms": self.slow_query_seconds * 1000,
+            "top_statements": [
+                {
+                    "statement": one_line(statement),
+                    "executions": executions,
+                    "total_ms": round(total * 1000, 2),
+                    "mean_ms": round(total / executions * 1000, 3),
+                    "slowest_ms": round(slowest * 1000, 2)
+                }
+                for statement, (executions, total, slowest) in ranked
+            ]
+        }
+
+class QueryProfilerMiddleware:
+    """
+    Collects the queries of each HTTP request into a QueryStats, which is
+    also left in the scope as "query_stats" for the metrics middleware.
+    """
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = scope["query_stats"] = QueryStats()
+        send_timed = send
+        if self.profiler.debug_header:
+            async def send_timed(message):
+                if message["type"] == "http.response.start":
+                    # Queries run after this point (streamed responses) aren't included
+                    MutableHeaders(raw=message["headers"]).append(
+                        "Server-Timing", f'sql;dur={stats.total * 1000:.2f};desc="{stats.count} queries"'
+                    )
+                await send(message)
+
+        token = current_queries.set(stats)
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            current_queries.reset(token)
+            self.profiler.finish(stats)
+
+def assert_query_budget(client, profiler, path, budget, **kwargs):
+    """
+    Test helper: GET path with a Starlette TestClient and fail if the request
+    ran more than budget queries, listing its slowest statements. Returns the
+    response. Cached responses and the calendar index run no SQL, so clear
+    the caches first to hold the uncached path to its budget.
+    """
+    profiler.last_request = None
+    response = client.get(path, **kwargs)
+    stats = profiler.last_request
+    if stats is None:
+        raise AssertionError(f"GET {path} was not profiled; is QueryProfilerMiddleware installed?")
+    if stats.count > budget:
+        raise AssertionError(f"GET {path} ran {stats.count} queries, over its budget of {budget}:\n{stats.report()}")
+    return response
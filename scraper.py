@@ -1,16 +1,13 @@
+import argparse
+import importlib
 import logging
-from scraper.sarkari_result import SarkariResultScraper
-from scraper.freshers_live import FreshersLiveScraper
-from scraper.employment_news import EmploymentNewsScraper
-from scraper.job_alert import JobAlertScraper
-from scraper.jagran_josh import JagranJoshScraper
-from scraper.ibps import IBPSScraper
-from scraper.sbi import SBIScraper
-from scraper.ssc import SSCScraper
-from scraper.upsc import UPSCScraper
-from scraper.freejobalert import FreeJobAlertScraper
-from scraper.govtjobs import GovtJobsScraper
-from db import add_or_update_exam
+from datetime import datetime
+from db import (
+    add_or_update_exam, get_last_run, set_last_run,
+    get_seen_feed_guids, mark_feed_guids_seen,
+    begin_staged_ingest, publish_staged_ingest, rollback_generation
+)
+from dedupe import resolve_duplicates
 
 # Set up logging
 logging.basicConfig(
@@ -24,23 +21,39 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def run_all_scrapers():
-    """Run all available scrapers and collect exam data"""
-    
-    # Initialize all scrapers
-    scrapers = [
-        SarkariResultScraper(),
-        FreeJobAlertScraper(),
-        GovtJobsScraper(),
-        FreshersLiveScraper(),
-        EmploymentNewsScraper(),
-        JobAlertScraper(),
-        JagranJoshScraper(),
-        IBPSScraper(),
-        SBIScraper(),
-        SSCScraper(),
-        UPSCScraper(),
-    ]
+# Sources in the order they run: name -> (module, class). A source's module
+# (and requests/bs4 with it) is only imported when that source runs
+SCRAPERS = {
+    "sarkari_result": ("scraper.sarkari_result", "SarkariResultScraper"),
+    "freejobalert": ("scraper.freejobalert", "FreeJobAlertScraper"),
+    "govtjobs": ("scraper.govtjobs", "GovtJobsScraper"),
+    "freshers_live": ("scraper.freshers_live", "FreshersLiveScraper"),
+    "employment_news": ("scraper.employment_news", "EmploymentNewsScraper"),
+    "job_alert": ("scraper.job_alert", "JobAlertScraper"),
+    "jagran_josh": ("scraper.jagran_josh", "JagranJoshScraper"),
+    "ibps": ("scraper.ibps", "IBPSScraper"),
+    "sbi": ("scraper.sbi", "SBIScraper"),
+    "ssc": ("scraper.ssc", "SSCScraper"),
+    "upsc": ("scraper.upsc", "UPSCScraper"),
+}
+
+def load_scraper(source):
+    """Import a source's module and return an instance of its scraper"""
+    module_name, class_name = SCRAPERS[source]
+    return getattr(importlib.import_module(module_name), class_name)()
+
+def run_all_scrapers(incremental=True, sources=None):
+    """
+    Run all available scrapers (or just the named sources) and collect exam data.
+
+    With incremental=True, sources that publish a feed or sitemap only fetch
+    the notifications that are new since their last successful run. A run in
+    which any discovered page failed doesn't count as successful.
+
+    Results are written to a staging copy of the database and published
+    atomically at the end, so the API never serves a half-updated dataset.
+    """
+    begin_staged_ingest()
     
     total_exams_added = 0
     successful_scrapers = []
@@ -48,14 +61,19 @@ def run_all_scrapers():
     
     logger.info("Starting comprehensive exam data scraping...")
     
-    for scraper in scrapers:
-        scraper_name = scraper.__class__.__name__
+    for source in sources or SCRAPERS:
+        # Run history is kept under the class name
+        scraper_name = SCRAPERS[source][1]
         logger.info(f"\n{'='*50}")
         logger.info(f"Running {scraper_name}")
         logger.info(f"{'='*50}")
         
         try:
-            exams = scraper.scrape()
+            scraper = load_scraper(source)
+            run_started = datetime.now()
+            since = get_last_run(scraper_name) if incremental else None
+            seen_guids = get_seen_feed_guids(scraper_name) if scraper.feed_url else set()
+            exams = scraper.scrape_incremental(since, seen_guids)
             
             if exams:
                 logger.info(f"{scraper_name} found {len(exams)} exams")
@@ -78,6 +96,17 @@ def run_all_scrapers():
             else:
                 logger.warning(f"{scraper_name} found no exams")
                 failed_scrapers.append((scraper_name, "No exams found"))
+            
+            if scraper.new_feed_guids:
+                mark_feed_guids_seen(scraper_name, scraper.new_feed_guids)
+            if scraper.failed_urls:
+                # Keep the cursor where it was so the next run discovers them again
+                logger.warning(
+                    f"{scraper_name}: {len(scraper.failed_urls)} discovered pages failed, "
+                    f"last run left at {since}"
+                )
+            else:
+                set_last_run(scraper_name, run_started)
                 
         except Exception as e:
             error_msg = str(e)
@@ -85,11 +114,26 @@ def run_all_scrapers():
             failed_scrapers.append((scraper_name, error_msg))
             continue
     
+    # Merge the same exam reported under different titles by different sources
+    try:
+        merged_count = resolve_duplicates()
+    except Exception as e:
+        logger.error(f"Duplicate resolution failed: {str(e)}")
+        merged_count = 0
+    
+    # Validate the staged data and swap it in
+    try:
+        generation = publish_staged_ingest()
+        logger.info(f"Published data generation {generation}")
+    except Exception as e:
+        logger.error(f"Scraped data was not published: {str(e)}")
+    
     # Print summary
     logger.info(f"\n{'='*60}")
     logger.info("SCRAPING SUMMARY")
     logger.info(f"{'='*60}")
     logger.info(f"Total exams added to database: {total_exams_added}")
+    logger.info(f"Duplicate exams merged: {merged_count}")
     logger.info(f"Successful scrapers: {len(successful_scrapers)}")
     logger.info(f"Failed scrapers: {len(failed_scrapers)}")
     
@@ -109,4 +153,13 @@ def run_all_scrapers():
     return total_exams_added
 
 if __name__ == "__main__":
-    run_all_scrapers() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape government exam notifications")
+    parser.add_argument("--full", action="store_true", help="Crawl listing pages instead of using feeds and sitemaps")
+    parser.add_argument("--rollback", action="store_true", help="Restore the previously published data generation")
+    parser.add_argument("--source", action="append", choices=list(SCRAPERS), help="Run only this source (repeatable)")
+    args = parser.parse_args()
+
+    if args.rollback:
+        rollback_generation()
+    else:
+        run_all_scrapers(incremental=not args.full, sources=args.source) 
\ No newline at end of file
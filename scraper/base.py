@@ -1,14 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from dateutil import parser as date_parser
+from email.utils import parsedate_to_datetime
+import xml.etree.ElementTree as ET
 import logging
 import urllib3
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Statuses that mean a discovered page is gone for good rather than failing
+GONE_STATUSES = (404, 410)
+
+# Namespace of the <loc>/<lastmod> elements in sitemaps; elements of
+# extensions (image:loc, video:*, news:*) sit in other namespaces
+SITEMAP_NAMESPACE = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
 # Configure logging
 logging.basicConfig(
     filename='scraper.log',
@@ -17,8 +27,20 @@ logging.basicConfig(
 )
 
 class BaseScraper(ABC):
+    # Sitemap (or sitemap index) used for incremental discovery. Sources
+    # without one are always crawled through their listing pages.
+    sitemap_url: Optional[str] = None
+    # RSS/Atom feed of new notifications; checked before the sitemap.
+    feed_url: Optional[str] = None
+
     def __init__(self, base_url: str):
         self.base_url = base_url
+        # GUIDs of feed entries handled by the last scrape_incremental call,
+        # to be recorded as seen once their exams are stored.
+        self.new_feed_guids: List[str] = []
+        # Discovered URLs whose detail page could not be fetched or parsed
+        # by the last scrape_incremental call; they are retried next run.
+        self.failed_urls: List[str] = []
         self.logger = logging.getLogger(self.__class__.__name__)
         self.session = requests.Session()
         # Common headers to avoid being blocked
@@ -57,6 +79,278 @@ class BaseScraper(ABC):
         """
         pass
 
+    def parse_detail(self, soup: BeautifulSoup, url: str, title: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract an exam dictionary from a notification detail page.
+
+        Scrapers that support sitemap discovery override this; the default
+        returns None so that discovered URLs are simply skipped.
+        """
+        return None
+
+    def scrape_detail(self, url: str, title: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a notification page and run it through parse_detail.
+        When no title is known (e.g. the URL came from a sitemap) the page heading is used.
+
+        parse_detail sets source_url to the scraper's base_url however the
+        page was found (listing, feed or sitemap), so an exam's source_url
+        doesn't change between full and incremental runs.
+        """
+        soup = self.get_soup(url)
+        if not title:
+            heading = soup.find('h1') or soup.find('title')
+            title = self.clean_text(heading.get_text()) if heading else ""
+        if not title:
+            return None
+
+        return self.parse_detail(soup, url, title)
+
+    def iter_sitemap(self, url: str, since: Optional[datetime] = None) -> Iterator[Tuple[str, Optional[datetime]]]:
+        """
+        Stream (loc, lastmod) pairs out of a sitemap or sitemap index.
+
+        The document is parsed incrementally from the response body and each
+        entry is discarded once read, so large sitemaps never sit in memory.
+        Child sitemaps of an index whose lastmod is not newer than `since`
+        are not fetched at all.
+        """
+        child_sitemaps = []
+        response = self.session.get(url, timeout=30, stream=True)
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+
+            root = None
+            loc = None
+            lastmod = None
+            for event, elem in ET.iterparse(response.raw, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                if event != 'end':
+                    continue
+
+                tag = elem.tag
+                if tag.startswith(SITEMAP_NAMESPACE):
+                    tag = tag[len(SITEMAP_NAMESPACE):]
+                elif tag.startswith('{'):
+                    continue
+                if tag == 'loc':
+                    loc = (elem.text or '').strip()
+                elif tag == 'lastmod':
+                    lastmod = self.parse_lastmod(elem.text)
+                elif tag in ('url', 'sitemap'):
+                    if loc:
+                        if tag == 'url':
+                            yield loc, lastmod
+                        elif since is None or lastmod is None or lastmod > since:
+                            child_sitemaps.append(loc)
+                    loc = None
+                    lastmod = None
+                    root.clear()
+        finally:
+            response.close()
+
+        for child_url in child_sitemaps:
+            self.logger.info(f"Reading child sitemap: {child_url}")
+            yield from self.iter_sitemap(child_url, since)
+
+    def parse_lastmod(self, value: Optional[str]) -> Optional[datetime]:
+        """
+        Parse a W3C datetime from a sitemap <lastmod> into a naive local datetime
+        """
+        if not value or not value.strip():
+            return None
+        try:
+            parsed = date_parser.isoparse(value.strip())
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+
+    def is_relevant_url(self, url: str) -> bool:
+        """
+        Cheap pre-filter for discovered URLs, before any detail page is fetched.
+        Scrapers that define exam_keywords only follow URLs whose slug mentions one.
+        """
+        if not url.startswith(self.base_url):
+            return False
+        keywords = getattr(self, 'exam_keywords', None)
+        if not keywords:
+            return True
+        slug = url[len(self.base_url):].upper().replace('-', ' ').replace('_', ' ')
+        return any(keyword in slug for keyword in keywords)
+
+    def discover_changed_urls(self, since: datetime) -> List[str]:
+        """
+        Return the relevant sitemap URLs whose lastmod is newer than `since`
+        """
+        changed = []
+        seen_lastmod = False
+        for loc, lastmod in self.iter_sitemap(self.sitemap_url, since):
+            if lastmod is None:
+                continue
+            seen_lastmod = True
+            if lastmod > since and self.is_relevant_url(loc):
+                changed.append(loc)
+
+        if not seen_lastmod:
+            raise ValueError(f"Sitemap {self.sitemap_url} has no <lastmod> entries")
+        return changed
+
+    def iter_feed(self, url: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream entries out of an RSS 2.0 or Atom feed.
+
+        Yields dictionaries with guid, link, title and published (datetime or
+        None). Each entry is dropped from the parse tree once yielded.
+        """
+        response = self.session.get(url, timeout=30, stream=True)
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+
+            root = None
+            entry = None
+            for event, elem in ET.iterparse(response.raw, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                tag = elem.tag.rsplit('}', 1)[-1]
+
+                if event == 'start':
+                    if tag in ('item', 'entry'):
+                        entry = {"guid": None, "link": None, "title": "", "published": None}
+                    continue
+                if entry is None:
+                    continue
+
+                text = (elem.text or '').strip()
+                if tag == 'title':
+                    entry["title"] = self.clean_text(text)
+                elif tag == 'link':
+                    # RSS carries the URL as text, Atom as an href attribute
+                    href = elem.get('href')
+                    if href is None:
+                        entry["link"] = text
+                    elif elem.get('rel', 'alternate') == 'alternate':
+                        entry["link"] = href
+                elif tag in ('guid', 'id'):
+                    entry["guid"] = text
+                elif tag in ('pubDate', 'published', 'updated'):
+                    if entry["published"] is None or tag == 'updated':
+                        entry["published"] = self.parse_feed_date(text)
+                elif tag in ('item', 'entry'):
+                    if not entry["guid"]:
+                        entry["guid"] = entry["link"]
+                    if entry["link"]:
+                        yield entry
+                    entry = None
+                    root.clear()
+        finally:
+            response.close()
+
+    def parse_feed_date(self, value: str) -> Optional[datetime]:
+        """
+        Parse an RSS (RFC 822) or Atom (RFC 3339) date into a naive local datetime
+        """
+        if not value:
+            return None
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return self.parse_lastmod(value)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+
+    def is_relevant_title(self, title: str) -> bool:
+        """
+        Title filter for feed entries, mirroring the listing-page keyword checks
+        """
+        keywords = getattr(self, 'exam_keywords', None)
+        if len(title) < 10:
+            return False
+        return not keywords or any(keyword in title.upper() for keyword in keywords)
+
+    def discover_feed_entries(self, since: Optional[datetime], seen_guids: Set[str]) -> List[Dict[str, Any]]:
+        """
+        Return the relevant feed entries that are new since the last run.
+
+        An entry is new if its GUID hasn't been seen before and, when it
+        carries a publication date, that date is newer than `since`.
+        """
+        entries = []
+        for entry in self.iter_feed(self.feed_url):
+            if entry["guid"] in seen_guids:
+                continue
+            if since and entry["published"] and entry["published"] <= since:
+                continue
+            if not self.is_relevant_title(entry["title"]):
+                continue
+            entries.append(entry)
+        return entries
+
+    def scrape_incremental(self, since: Optional[datetime] = None, seen_guids: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Scrape only the notifications that changed since the last run.
+
+        Discovery tries the source's feed, then its sitemap. The first run
+        (no `since`) and sources where neither can be used fall back to the
+        full listing crawl in scrape().
+        """
+        self.new_feed_guids = []
+        self.failed_urls = []
+        if since is None:
+            return self.scrape()
+
+        if self.feed_url:
+            try:
+                entries = self.discover_feed_entries(since, seen_guids or set())
+                self.logger.info(f"Feed discovery found {len(entries)} new entries since {since}")
+                exams = self.scrape_discovered([(entry["link"], entry["title"]) for entry in entries])
+                # Entries whose page failed stay unseen, so the next run retries them
+                failed = set(self.failed_urls)
+                self.new_feed_guids = [entry["guid"] for entry in entries if entry["link"] not in failed]
+                return exams
+            except Exception as e:
+                self.logger.warning(f"Feed discovery failed for {self.feed_url}: {str(e)}")
+
+        if self.sitemap_url:
+            try:
+                urls = self.discover_changed_urls(since)
+                self.logger.info(f"Sitemap discovery found {len(urls)} changed URLs since {since}")
+                return self.scrape_discovered([(url, None) for url in urls])
+            except Exception as e:
+                self.logger.warning(f"Sitemap discovery failed for {self.sitemap_url}: {str(e)}")
+
+        self.logger.info("Falling back to listing crawl")
+        return self.scrape()
+
+    def scrape_discovered(self, targets: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """
+        Run detail extraction over (url, title) pairs found by feed or sitemap discovery.
+
+        URLs that fail are added to failed_urls. Pages that are gone or that
+        parse_detail doesn't recognise as an exam count as handled.
+        """
+        exams = []
+        for url, title in targets:
+            try:
+                exam_data = self.scrape_detail(url, title)
+                if exam_data:
+                    exams.append(exam_data)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code in GONE_STATUSES:
+                    self.logger.info(f"Discovered URL {url} is gone ({e.response.status_code})")
+                else:
+                    self.logger.error(f"Error processing discovered URL {url}: {str(e)}")
+                    self.failed_urls.append(url)
+            except Exception as e:
+                self.logger.error(f"Error processing discovered URL {url}: {str(e)}")
+                self.failed_urls.append(url)
+        return exams
+
     def parse_date(self, date_str: str, formats: List[str]) -> datetime:
         """
         Try to parse a date string using multiple formats
@@ -7,6 +7,8 @@ import logging
 class FreeJobAlertScraper(BaseScraper):
     def __init__(self):
         super().__init__("https://www.freejobalert.com")
+        self.sitemap_url = f"{self.base_url}/sitemap.xml"
+        self.feed_url = f"{self.base_url}/feed"
         self.logger = logging.getLogger(__name__)
         
         # Common keywords to identify exam notifications
@@ -120,6 +122,75 @@ class FreeJobAlertScraper(BaseScraper):
         else:
             return 'OTHER'
 
+    def parse_detail(self, soup, url: str, title: str) -> Dict[str, Any]:
+        """Extract exam and application dates from a notification page"""
+        content = soup.get_text()
+        
+        # Extract dates
+        exam_date = None
+        application_start = None
+        application_end = None
+
+        # Look for exam date patterns
+        exam_patterns = [
+            r'[Ee]xam\s+[Dd]ate[:\s]*([^.]+)',
+            r'[Tt]est\s+[Dd]ate[:\s]*([^.]+)',
+            r'[Ee]xamination\s+[Dd]ate[:\s]*([^.]+)',
+            r'[Dd]ate\s+of\s+[Ee]xam[:\s]*([^.]+)'
+        ]
+
+        for pattern in exam_patterns:
+            match = re.search(pattern, content, re.IGNORECASE)
+            if match:
+                date_str = match.group(1).strip()
+                exam_date = self.parse_date(date_str)
+                if exam_date:
+                    break
+
+        # Look for application dates
+        app_start_patterns = [
+            r'[Aa]pplication\s+[Ss]tart[:\s]*([^.]+)',
+            r'[Oo]nline\s+[Aa]pplication\s+[Ss]tart[:\s]*([^.]+)',
+            r'[Rr]egistration\s+[Ss]tart[:\s]*([^.]+)'
+        ]
+
+        app_end_patterns = [
+            r'[Aa]pplication\s+[Ee]nd[:\s]*([^.]+)',
+            r'[Ll]ast\s+[Dd]ate[:\s]*([^.]+)',
+            r'[Dd]eadline[:\s]*([^.]+)',
+            r'[Aa]pplication\s+[Dd]eadline[:\s]*([^.]+)'
+        ]
+
+        for pattern in app_start_patterns:
+            match = re.search(pattern, content, re.IGNORECASE)
+            if match:
+                date_str = match.group(1).strip()
+                application_start = self.parse_date(date_str)
+                if application_start:
+                    break
+
+        for pattern in app_end_patterns:
+            match = re.search(pattern, content, re.IGNORECASE)
+            if match:
+                date_str = match.group(1).strip()
+                application_end = self.parse_date(date_str)
+                if application_end:
+                    break
+        
+        # If we found at least an exam date or application dates, return it
+        if exam_date or application_start or application_end:
+            return {
+                "exam_name": title,
+                "conducting_body": self.get_conducting_body(title),
+                "exam_date": exam_date,
+                "application_start": application_start,
+                "application_end": application_end,
+                "official_link": url,
+                "source_url": self.base_url
+            }
+        
+        return None
+
     def scrape(self) -> List[Dict[str, Any]]:
         """
         Scrape exam notifications from FreeJobAlert
@@ -163,74 +234,8 @@ class FreeJobAlertScraper(BaseScraper):
                         
                         # Get details from the page
                         try:
-                            detail_soup = self.get_soup(full_url)
-                            content = detail_soup.get_text()
-                            
-                            # Extract dates
-                            exam_date = None
-                            application_start = None
-                            application_end = None
-                            
-                            # Look for exam date patterns
-                            exam_patterns = [
-                                r'[Ee]xam\s+[Dd]ate[:\s]*([^.]+)',
-                                r'[Tt]est\s+[Dd]ate[:\s]*([^.]+)',
-                                r'[Ee]xamination\s+[Dd]ate[:\s]*([^.]+)',
-                                r'[Dd]ate\s+of\s+[Ee]xam[:\s]*([^.]+)'
-                            ]
-                            
-                            for pattern in exam_patterns:
-                                match = re.search(pattern, content, re.IGNORECASE)
-                                if match:
-                                    date_str = match.group(1).strip()
-                                    exam_date = self.parse_date(date_str)
-                                    if exam_date:
-                                        break
-                            
-                            # Look for application dates
-                            app_start_patterns = [
-                                r'[Aa]pplication\s+[Ss]tart[:\s]*([^.]+)',
-                                r'[Oo]nline\s+[Aa]pplication\s+[Ss]tart[:\s]*([^.]+)',
-                                r'[Rr]egistration\s+[Ss]tart[:\s]*([^.]+)'
-                            ]
-                            
-                            app_end_patterns = [
-                                r'[Aa]pplication\s+[Ee]nd[:\s]*([^.]+)',
-                                r'[Ll]ast\s+[Dd]ate[:\s]*([^.]+)',
-                                r'[Dd]eadline[:\s]*([^.]+)',
-                                r'[Aa]pplication\s+[Dd]eadline[:\s]*([^.]+)'
-                            ]
-                            
-                            for pattern in app_start_patterns:
-                                match = re.search(pattern, content, re.IGNORECASE)
-                                if match:
-                                    date_str = match.group(1).strip()
-                                    application_start = self.parse_date(date_str)
-                                    if application_start:
-                                        break
-                            
-                            for pattern in app_end_patterns:
-                                match = re.search(pattern, content, re.IGNORECASE)
-                                if match:
-                                    date_str = match.group(1).strip()
-                                    application_end = self.parse_date(date_str)
-                                    if application_end:
-                                        break
-                            
-                            # If we found at least an exam date or application dates, add it
-                            if exam_date or application_start or application_end:
-                                conducting_body = self.get_conducting_body(link_text)
-                                
-                                exam_data = {
-                                    "exam_name": link_text,
-                                    "conducting_body": conducting_body,
-                                    "exam_date": exam_date,
-                                    "application_start": application_start,
-                                    "application_end": application_end,
-                                    "official_link": full_url,
-                                    "source_url": url
-                                }
-                                
+                            exam_data = self.scrape_detail(full_url, link_text)
+                            if exam_data:
                                 exams.append(exam_data)
                                 self.logger.info(f"Added exam: {link_text}")
                                 
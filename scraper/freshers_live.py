@@ -7,6 +7,8 @@ import logging
 class FreshersLiveScraper(BaseScraper):
     def __init__(self):
         super().__init__("https://www.fresherslive.com")
+        self.sitemap_url = f"{self.base_url}/sitemap.xml"
+        self.feed_url = f"{self.base_url}/feed"
         # Update to the correct URL
         self.exam_calendar_url = "https://www.fresherslive.com/government-jobs/exam-calendar"
         self.latest_jobs_url = "https://www.fresherslive.com/government-jobs/latest"
@@ -213,7 +215,15 @@ class FreshersLiveScraper(BaseScraper):
     def extract_exam_info_from_page(self, url: str, title: str) -> Dict[str, Any]:
         """Extract exam information from a notification page"""
         try:
-            soup = self.get_soup(url)
+            return self.scrape_detail(url, title)
+        except Exception as e:
+            self.logger.error(f"Error extracting info from page {url}: {str(e)}")
+        
+        return None
+    
+    def parse_detail(self, soup, url: str, title: str) -> Dict[str, Any]:
+        """Extract exam and application dates from a notification page"""
+        try:
             content = soup.get_text()
             
             # Look for exam date
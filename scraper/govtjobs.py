@@ -7,6 +7,8 @@ import logging
 class GovtJobsScraper(BaseScraper):
     def __init__(self):
         super().__init__("https://www.govtjobs.in")
+        self.sitemap_url = f"{self.base_url}/sitemap.xml"
+        self.feed_url = f"{self.base_url}/feed"
         self.logger = logging.getLogger(__name__)
         
         # Exam-related keywords
@@ -88,6 +90,70 @@ class GovtJobsScraper(BaseScraper):
         else:
             return 'OTHER'
 
+    def parse_detail(self, soup, url: str, title: str) -> Dict[str, Any]:
+        """Extract exam and application dates from a notification page"""
+        content = soup.get_text()
+        
+        # Extract dates
+        exam_date = None
+        application_start = None
+        application_end = None
+
+        # Look for exam date
+        exam_patterns = [
+            r'[Ee]xam\s+[Dd]ate[:\s-]*([^\n.]+)',
+            r'[Tt]est\s+[Dd]ate[:\s-]*([^\n.]+)',
+            r'[Ee]xamination\s+[Dd]ate[:\s-]*([^\n.]+)'
+        ]
+
+        for pattern in exam_patterns:
+            match = re.search(pattern, content)
+            if match:
+                exam_date = self.parse_date(match.group(1))
+                if exam_date:
+                    break
+
+        # Look for application dates
+        start_patterns = [
+            r'[Aa]pplication\s+[Ss]tart[:\s-]*([^\n.]+)',
+            r'[Oo]nline\s+[Aa]pplication[:\s-]*([^\n.]+)',
+            r'[Rr]egistration\s+[Ss]tart[:\s-]*([^\n.]+)'
+        ]
+
+        end_patterns = [
+            r'[Aa]pplication\s+[Ee]nd[:\s-]*([^\n.]+)',
+            r'[Ll]ast\s+[Dd]ate[:\s-]*([^\n.]+)',
+            r'[Dd]eadline[:\s-]*([^\n.]+)'
+        ]
+
+        for pattern in start_patterns:
+            match = re.search(pattern, content)
+            if match:
+                application_start = self.parse_date(match.group(1))
+                if application_start:
+                    break
+
+        for pattern in end_patterns:
+            match = re.search(pattern, content)
+            if match:
+                application_end = self.parse_date(match.group(1))
+                if application_end:
+                    break
+        
+        # Return exam if we have useful information
+        if exam_date or application_start or application_end:
+            return {
+                "exam_name": title,
+                "conducting_body": self.get_conducting_body(title),
+                "exam_date": exam_date,
+                "application_start": application_start,
+                "application_end": application_end,
+                "official_link": url,
+                "source_url": self.base_url
+            }
+        
+        return None
+
     def scrape(self) -> List[Dict[str, Any]]:
         """Scrape government job notifications"""
         self.logger.info("Starting GovtJobs scraper")
@@ -130,69 +196,8 @@ class GovtJobsScraper(BaseScraper):
                         
                         # Get detailed information
                         try:
-                            detail_soup = self.get_soup(full_url)
-                            content = detail_soup.get_text()
-                            
-                            # Extract dates
-                            exam_date = None
-                            application_start = None
-                            application_end = None
-                            
-                            # Look for exam date
-                            exam_patterns = [
-                                r'[Ee]xam\s+[Dd]ate[:\s-]*([^\n.]+)',
-                                r'[Tt]est\s+[Dd]ate[:\s-]*([^\n.]+)',
-                                r'[Ee]xamination\s+[Dd]ate[:\s-]*([^\n.]+)'
-                            ]
-                            
-                            for pattern in exam_patterns:
-                                match = re.search(pattern, content)
-                                if match:
-                                    exam_date = self.parse_date(match.group(1))
-                                    if exam_date:
-                                        break
-                            
-                            # Look for application dates
-                            start_patterns = [
-                                r'[Aa]pplication\s+[Ss]tart[:\s-]*([^\n.]+)',
-                                r'[Oo]nline\s+[Aa]pplication[:\s-]*([^\n.]+)',
-                                r'[Rr]egistration\s+[Ss]tart[:\s-]*([^\n.]+)'
-                            ]
-                            
-                            end_patterns = [
-                                r'[Aa]pplication\s+[Ee]nd[:\s-]*([^\n.]+)',
-                                r'[Ll]ast\s+[Dd]ate[:\s-]*([^\n.]+)',
-                                r'[Dd]eadline[:\s-]*([^\n.]+)'
-                            ]
-                            
-                            for pattern in start_patterns:
-                                match = re.search(pattern, content)
-                                if match:
-                                    application_start = self.parse_date(match.group(1))
-                                    if application_start:
-                                        break
-                            
-                            for pattern in end_patterns:
-                                match = re.search(pattern, content)
-                                if match:
-                                    application_end = self.parse_date(match.group(1))
-                                    if application_end:
-                                        break
-                            
-                            # Add exam if we have useful information
-                            if exam_date or application_start or application_end:
-                                conducting_body = self.get_conducting_body(title)
-                                
-                                exam_data = {
-                                    "exam_name": title,
-                                    "conducting_body": conducting_body,
-                                    "exam_date": exam_date,
-                                    "application_start": application_start,
-                                    "application_end": application_end,
-                                    "official_link": full_url,
-                                    "source_url": url
-                                }
-                                
+                            exam_data = self.scrape_detail(full_url, title)
+                            if exam_data:
                                 exams.append(exam_data)
                                 self.logger.info(f"Added: {title}")
                                 
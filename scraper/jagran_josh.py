@@ -7,6 +7,8 @@ import logging
 class JagranJoshScraper(BaseScraper):
     def __init__(self):
         super().__init__("https://www.jagranjosh.com")
+        self.sitemap_url = f"{self.base_url}/sitemap.xml"
+        self.feed_url = f"{self.base_url}/feed"
         self.logger = logging.getLogger(__name__)
 
     def scrape(self) -> List[Dict[str, Any]]:
@@ -103,18 +105,17 @@ class JagranJoshScraper(BaseScraper):
     def extract_exam_details_from_page(self, url: str, title: str) -> Dict[str, Any]:
         """Extract detailed exam information from individual page"""
         try:
-            soup = self.get_soup(url)
-            content = soup.get_text()
-            
-            # Look for exam dates in the content
-            exam_info = self.extract_dates_from_text(content, title, url)
-            return exam_info
+            return self.scrape_detail(url, title)
             
         except Exception as e:
             self.logger.error(f"Error extracting details from page {url}: {str(e)}")
         
         return None
     
+    def parse_detail(self, soup, url: str, title: str) -> Dict[str, Any]:
+        """Look for exam dates in a notification page's content"""
+        return self.extract_dates_from_text(soup.get_text(), title, url)
+    
     def extract_dates_from_text(self, text: str, title: str, link: str) -> Dict[str, Any]:
         """Extract exam information and dates from text"""
         try:
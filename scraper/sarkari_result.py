@@ -7,6 +7,7 @@ import logging
 class SarkariResultScraper(BaseScraper):
     def __init__(self):
         super().__init__("https://www.sarkariresult.com")
+        self.sitemap_url = f"{self.base_url}/sitemap.xml"
         self.logger = logging.getLogger(__name__)
         
         # Common keywords to identify exam notifications
@@ -75,6 +76,57 @@ class SarkariResultScraper(BaseScraper):
         else:
             return 'OTHER'
 
+    def parse_detail(self, soup, url: str, title: str) -> Dict[str, Any]:
+        """Extract exam and application dates from a notification page"""
+        content = soup.get_text()
+        
+        # Extract dates
+        exam_date = None
+        application_start = None
+        application_end = None
+
+        # Look for exam date
+        exam_date_patterns = [
+            r'[Ee]xam\s+[Dd]ate.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
+            r'[Ee]xamination\s+[Dd]ate.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
+            r'[Tt]est\s+[Dd]ate.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})'
+        ]
+
+        for pattern in exam_date_patterns:
+            match = re.search(pattern, content)
+            if match:
+                exam_date = self.parse_date(match.group(1))
+                if exam_date:
+                    break
+
+        # Look for application dates
+        start_match = re.search(
+            r'[Aa]pplication\s+[Ss]tarts?.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
+            content
+        )
+        end_match = re.search(
+            r'[Aa]pplication\s+[Ee]nds?.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
+            content
+        )
+
+        if start_match:
+            application_start = self.parse_date(start_match.group(1))
+        if end_match:
+            application_end = self.parse_date(end_match.group(1))
+        
+        if exam_date:
+            return {
+                "exam_name": title,
+                "conducting_body": self.get_conducting_body(title),
+                "exam_date": exam_date,
+                "application_start": application_start,
+                "application_end": application_end,
+                "official_link": url,
+                "source_url": self.base_url
+            }
+        
+        return None
+
     def scrape(self) -> List[Dict[str, Any]]:
         """
         Scrape exam notifications from Sarkari Result
@@ -107,56 +159,8 @@ class SarkariResultScraper(BaseScraper):
                         notification_url = href if href.startswith('http') else (
                             self.base_url + href if href.startswith('/') else self.base_url + '/' + href
                         )
-                        notification_soup = self.get_soup(notification_url)
-                        content = notification_soup.get_text()
-                        
-                        # Extract dates
-                        exam_date = None
-                        application_start = None
-                        application_end = None
-                        
-                        # Look for exam date
-                        exam_date_patterns = [
-                            r'[Ee]xam\s+[Dd]ate.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
-                            r'[Ee]xamination\s+[Dd]ate.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
-                            r'[Tt]est\s+[Dd]ate.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})'
-                        ]
-                        
-                        for pattern in exam_date_patterns:
-                            match = re.search(pattern, content)
-                            if match:
-                                exam_date = self.parse_date(match.group(1))
-                                if exam_date:
-                                    break
-                        
-                        # Look for application dates
-                        start_match = re.search(
-                            r'[Aa]pplication\s+[Ss]tarts?.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
-                            content
-                        )
-                        end_match = re.search(
-                            r'[Aa]pplication\s+[Ee]nds?.*?(\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}\s+[A-Za-z]+\s+\d{4})',
-                            content
-                        )
-                        
-                        if start_match:
-                            application_start = self.parse_date(start_match.group(1))
-                        if end_match:
-                            application_end = self.parse_date(end_match.group(1))
-                        
-                        if exam_date:
-                            conducting_body = self.get_conducting_body(link_text)
-                            
-                            exam_data = {
-                                "exam_name": link_text,
-                                "conducting_body": conducting_body,
-                                "exam_date": exam_date,
-                                "application_start": application_start,
-                                "application_end": application_end,
-                                "official_link": notification_url,
-                                "source_url": self.base_url
-                            }
-                            
+                        exam_data = self.scrape_detail(notification_url, link_text)
+                        if exam_data:
                             exams.append(exam_data)
                             self.logger.info(f"Successfully added exam: {link_text}")
                             
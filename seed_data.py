@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime
-from db import Session, add_or_update_exam
+from db import Session, add_or_update_exam, staged_ingest
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -424,13 +424,15 @@ def seed_comprehensive_exam_data():
     try:
         logger.info("Starting to seed comprehensive exam data...")
         
-        for exam_data in exams_data:
-            try:
-                add_or_update_exam(exam_data)
-                logger.info(f"Added/Updated exam: {exam_data['exam_name']}")
-            except Exception as e:
-                logger.error(f"Error adding exam {exam_data['exam_name']}: {str(e)}")
-                continue
+        # Seed into a staging copy that is published in one atomic swap
+        with staged_ingest():
+            for exam_data in exams_data:
+                try:
+                    add_or_update_exam(exam_data)
+                    logger.info(f"Added/Updated exam: {exam_data['exam_name']}")
+                except Exception as e:
+                    logger.error(f"Error adding exam {exam_data['exam_name']}: {str(e)}")
+                    continue
         
         logger.info("Comprehensive exam data seeding completed successfully!")
         
@@ -0,0 +1,96 @@
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are optional
+    msgpack = None
+
+# Response formats: name -> media type. "columns" sends field names once
+# and each row as an array, which is far smaller for long lists.
+FORMATS = {
+    "json": "application/json",
+    "columns": "application/vnd.exams.columns+json",
+    "msgpack": "application/msgpack",
+}
+ACCEPTED_MEDIA_TYPES = {
+    "application/json": "json",
+    "application/vnd.exams.columns+json": "columns",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+}
+
+class Rows:
+    """
+    A result set as field names plus row tuples. Queries return these so
+    the serializer can project, reshape and encode rows without building
+    a dictionary per row first.
+    """
+    __slots__ = ('fields', 'rows')
+
+    def __init__(self, fields, rows):
+        self.fields = tuple(fields)
+        self.rows = rows
+
+    def project(self, fields):
+        """Keep only the named fields, in the order given; raises ValueError for unknown names"""
+        unknown = [field for field in fields if field not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(self.fields)}")
+        indexes = [self.fields.index(field) for field in fields]
+        return Rows(fields, [tuple(row[i] for i in indexes) for row in self.rows])
+
+    def records(self):
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in self.rows]
+
+    def columns(self):
+        return {"fields": self.fields, "rows": self.rows}
+
+def parse_fields(fields):
+    """Split a ?fields=a,b,c parameter into names, or None when not given"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    return names or None
+
+def negotiate_format(accept=None, format=None):
+    """
+    Pick a response format from an explicit ?format= or the Accept header
+    (first supported type listed wins); defaults to JSON. Raises ValueError
+    for an explicitly requested format that isn't available.
+    """
+    if format:
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format '{format}'. Available: {', '.join(FORMATS)}")
+        if format == "msgpack" and msgpack is None:
+            raise ValueError("MessagePack support is not installed")
+        return format
+
+    for part in (accept or '').split(','):
+        name = ACCEPTED_MEDIA_TYPES.get(part.split(';')[0].strip().lower())
+        if name and not (name == "msgpack" and msgpack is None):
+            return name
+    return "json"
+
+def project(data, fields):
+    """Apply a field projection to every Rows object in a response"""
+    if not fields:
+        return data
+    if isinstance(data, Rows):
+        return data.project(fields)
+    if isinstance(data, dict):
+        return {key: project(value, fields) for key, value in data.items()}
+    return data
+
+def serialize(data, format="json", fields=None):
+    """Encode a response (plain data with Rows inside) as bytes in the given format"""
+    data = project(data, fields)
+
+    def default(value):
+        if isinstance(value, Rows):
+            return value.columns() if format == "columns" else value.records()
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    if format == "msgpack":
+        return msgpack.packb(data, default=default, use_bin_type=True)
+    return orjson.dumps(data, default=default)
@@ -0,0 +1,209 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+import app as webapp
+from calendar_index import build_calendar_index
+from db import Session as DBSession, current_data_generation, init_db
+
+# Pre-fork supervisor: runs several worker processes on one listening socket.
+# The calendar index is built once here, before forking, so every worker
+# reads the same copy-on-write pages instead of building its own; when a new
+# data generation is published the index is rebuilt and the workers are
+# replaced one set at a time.
+# Pages are only shared until a worker touches them: updating reference
+# counts copies each page of the index a worker reads, so workers still end
+# up with a large private share (see Production Server in the README).
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# How often the supervisor checks for a new data generation
+GENERATION_POLL_SECONDS = 5
+
+# A worker that exits is replaced after a delay that doubles, up to the
+# maximum, while workers keep exiting young, so one that fails at startup
+# doesn't make the supervisor fork in a tight loop
+RESTART_DELAY_SECONDS = 0.5
+MAX_RESTART_DELAY_SECONDS = 30
+
+# A worker that ran at least this long is replaced at once and resets the delay
+STABLE_WORKER_SECONDS = 30
+
+# How long a replaced worker may keep finishing requests (and exports); open
+# event streams are closed after this and reconnect with Last-Event-ID
+WORKER_GRACEFUL_SHUTDOWN = 10
+
+def build_shared_index():
+    """Build the calendar index in the supervisor and hand it to the app module"""
+    db = DBSession()
+    try:
+        index = build_calendar_index(db)
+    finally:
+        db.close()
+    webapp.calendar_index = index
+    webapp.calendar_index_shared = True
+    # Move everything allocated so far out of the collector's reach: a
+    # collection in a worker would otherwise write to (and so copy) every
+    # page holding a shared object
+    gc.collect()
+    gc.freeze()
+    return index
+
+def run_worker(sock, log_level):
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        webapp.app, log_level=log_level, timeout_graceful_shutdown=WORKER_GRACEFUL_SHUTDOWN
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+def spawn_worker(sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            run_worker(sock, log_level)
+        except BaseException:
+            logger.exception("Worker failed")
+            status = 1
+        finally:
+            # os._exit skips interpreter cleanup, including flushing the access log
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+    return pid
+
+class Supervisor:
+    def __init__(self, sock, workers, log_level):
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.pids = set()
+        self.retiring = set()
+        # pid -> when it was started (monotonic)
+        self.started = {}
+        self.restart_delay = 0
+        # When each pending replacement for an exited worker is due (monotonic)
+        self.restarts_due = []
+        self.stopping = False
+        self.reload = False
+
+    def spawn(self, count):
+        for _ in range(count):
+            pid = spawn_worker(self.sock, self.log_level)
+            self.pids.add(pid)
+            self.started[pid] = time.monotonic()
+
+    def replace_workers(self):
+        """Start a full set of workers on the current index, then retire the old set"""
+        old = self.pids
+        self.pids = set()
+        self.restarts_due = []
+        self.spawn(self.workers)
+        # The old workers stop accepting at once; connections queued on the
+        # shared socket meanwhile are picked up by the new set
+        for pid in old:
+            os.kill(pid, signal.SIGTERM)
+        self.retiring |= old
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.started.pop(pid, None)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+            elif pid in self.pids:
+                self.pids.discard(pid)
+                if not self.stopping:
+                    self.schedule_restart(pid, status, started)
+
+    def schedule_restart(self, pid, status, started):
+        now = time.monotonic()
+        if started is not None and now - started >= STABLE_WORKER_SECONDS:
+            self.restart_delay = 0
+        else:
+            self.restart_delay = min(max(self.restart_delay * 2, RESTART_DELAY_SECONDS), MAX_RESTART_DELAY_SECONDS)
+        logger.warning(f"Worker {pid} exited with status {status}; starting a replacement in {self.restart_delay:g}s")
+        self.restarts_due.append(now + self.restart_delay)
+
+    def start_due_restarts(self):
+        now = time.monotonic()
+        due = [at for at in self.restarts_due if at <= now]
+        if due:
+            self.restarts_due = [at for at in self.restarts_due if at > now]
+            self.spawn(len(due))
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def hangup(self, signum, frame):
+        self.reload = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, self.hangup)
+
+        index = build_shared_index()
+        self.spawn(self.workers)
+        logger.info(f"Started {self.workers} workers on generation {index.generation}")
+
+        next_check = time.monotonic() + GENERATION_POLL_SECONDS
+        while not self.stopping:
+            self.reap()
+            self.start_due_restarts()
+            if self.reload or time.monotonic() >= next_check:
+                next_check = time.monotonic() + GENERATION_POLL_SECONDS
+                try:
+                    if self.reload or current_data_generation() != index.generation:
+                        gc.unfreeze()
+                        webapp.calendar_index = None
+                        index = build_shared_index()
+                        self.replace_workers()
+                        logger.info(f"Replaced workers for generation {index.generation}")
+                except Exception as e:
+                    logger.error(f"Error rebuilding calendar index: {str(e)}")
+                self.reload = False
+            time.sleep(0.2)
+
+        logger.info("Stopping workers")
+        for pid in self.pids | self.retiring:
+            os.kill(pid, signal.SIGTERM)
+        for pid in self.pids | self.retiring:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the server in several worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    init_db()
+    sock = socket.socket(socket.AF_INET6 if ":" in args.host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    Supervisor(sock, args.workers, args.log_level).run()
@@ -37,6 +37,23 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Refresh when ingestion adds or changes exams (pushed over Server-Sent
+    // Events); a burst of changes triggers one refetch
+    if (window.EventSource) {
+        const changes = new EventSource('/api/events/stream');
+        let refetchTimer = null;
+        const scheduleRefetch = function() {
+            clearTimeout(refetchTimer);
+            refetchTimer = setTimeout(function() {
+                console.log('Exams changed, refreshing calendar');
+                calendar.refetchEvents();
+            }, 1000);
+        };
+        ['insert', 'update', 'delete', 'resync'].forEach(function(type) {
+            changes.addEventListener(type, scheduleRefetch);
+        });
+    }
+
     // Fetch events for the calendar
     async function fetchEvents(info, successCallback, failureCallback) {
         try {
@@ -47,75 +64,44 @@ document.addEventListener('DOMContentLoaded', function() {
             const conductingBody = conductingBodyElement ? conductingBodyElement.value : '';
             console.log('Conducting body filter:', conductingBody);
             
-            // Get all months in the date range
-            const months = getMonthsInRange(info.start, info.end);
-            console.log('Months to fetch:', months);
-            
-            // Fetch data for all months
-            const allEvents = [];
+            // One request for exactly the visible window
+            const params = new URLSearchParams({
+                start: toDateParam(info.start),
+                end: toDateParam(info.end)
+            });
+            if (conductingBody && conductingBody !== '') {
+                params.set('body', conductingBody);
+            }
+            const url = `/api/exams/range?${params}`;
+            console.log(`Fetching from URL: ${url}`);
             
-            for (const monthInfo of months) {
-                let url = `/exams/month/${monthInfo.year}/${monthInfo.month}`;
-                if (conductingBody && conductingBody !== '') {
-                    url += `?conducting_body=${encodeURIComponent(conductingBody)}`;
-                }
-                
-                console.log(`Fetching from URL: ${url}`);
-                
-                try {
-                    const response = await fetch(url);
-                    if (!response.ok) {
-                        console.error(`HTTP error! status: ${response.status} for ${url}`);
-                        continue;
-                    }
-                    
-                    const exams = await response.json();
-                    console.log(`✓ Received ${exams.length} exams for ${monthInfo.year}-${monthInfo.month}`);
-                    
-                    // Filter events to only include those in the requested date range
-                    const filteredExams = exams.filter(exam => {
-                        const examDate = new Date(exam.date);
-                        return examDate >= info.start && examDate < info.end;
-                    });
-                    
-                    console.log(`✓ Filtered to ${filteredExams.length} exams in date range`);
-                    
-                    const events = filteredExams.map(exam => {
-                        const event = {
-                            id: exam.id,
-                            title: exam.name,
-                            start: exam.date,
-                            allDay: true,
-                            backgroundColor: getEventColor(exam.body),
-                            borderColor: getEventColor(exam.body),
-                            textColor: '#ffffff',
-                            extendedProps: {
-                                body: exam.body,
-                                link: exam.link,
-                                app_start: exam.app_start,
-                                app_end: exam.app_end,
-                                app_start_formatted: exam.app_start_formatted,
-                                app_end_formatted: exam.app_end_formatted,
-                                exam_date_formatted: exam.exam_date_formatted
-                            }
-                        };
-                        console.log(`✓ Created event: ${event.title} on ${event.start}`);
-                        return event;
-                    });
-                    
-                    allEvents.push(...events);
-                    
-                } catch (fetchError) {
-                    console.error(`Error fetching ${url}:`, fetchError);
-                }
+            const response = await fetch(url);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status} for ${url}`);
             }
             
-            console.log(`=== FINAL RESULT: ${allEvents.length} events ===`);
-            allEvents.forEach(event => {
-                console.log(`  - ${event.title} on ${event.start}`);
-            });
+            const exams = await response.json();
+            const events = exams.map(exam => ({
+                id: exam.id,
+                title: exam.title,
+                start: exam.start,
+                allDay: true,
+                backgroundColor: getEventColor(exam.body),
+                borderColor: getEventColor(exam.body),
+                textColor: '#ffffff',
+                extendedProps: {
+                    body: exam.body,
+                    link: exam.link,
+                    app_start: exam.app_start,
+                    app_end: exam.app_end,
+                    app_start_formatted: formatDisplayDate(exam.app_start, 'Not Available'),
+                    app_end_formatted: formatDisplayDate(exam.app_end, 'Not Available'),
+                    exam_date_formatted: formatDisplayDate(exam.start, 'TBA')
+                }
+            }));
             
-            successCallback(allEvents);
+            console.log(`=== FINAL RESULT: ${events.length} events ===`);
+            successCallback(events);
             
         } catch (error) {
             console.error('Error in fetchEvents:', error);
@@ -123,22 +109,21 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    // Helper function to get all months in a date range
-    function getMonthsInRange(startDate, endDate) {
-        const months = [];
-        const current = new Date(startDate);
-        
-        while (current <= endDate) {
-            months.push({
-                year: current.getFullYear(),
-                month: current.getMonth() + 1
-            });
-            
-            // Move to next month
-            current.setMonth(current.getMonth() + 1);
+    // Local calendar date as YYYY-MM-DD (toISOString would shift it to UTC)
+    function toDateParam(date) {
+        const month = String(date.getMonth() + 1).padStart(2, '0');
+        const day = String(date.getDate()).padStart(2, '0');
+        return `${date.getFullYear()}-${month}-${day}`;
+    }
+
+    // "2025-06-01" -> "01 Jun 2025", matching the server-rendered pages
+    function formatDisplayDate(value, fallback) {
+        if (!value) {
+            return fallback;
         }
-        
-        return months;
+        const [year, month, day] = value.split('-').map(Number);
+        const monthName = new Date(year, month - 1, day).toLocaleString('en-US', { month: 'short' });
+        return `${String(day).padStart(2, '0')} ${monthName} ${year}`;
     }
 
     // Handle event clicks - show detailed modal
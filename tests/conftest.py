@@ -0,0 +1,74 @@
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+# The modules live at the top of the repository, next to this directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """An empty exams.db in a temporary directory, which the tests run in"""
+    monkeypatch.chdir(tmp_path)
+    for directory in ("static", "templates"):
+        os.symlink(os.path.join(ROOT, directory), tmp_path / directory)
+    # SQLAlchemy resolves the file path when the engine is created
+    live_engine = db.engine
+    engine = db.create_db_engine(db.DATABASE_PATH)
+    monkeypatch.setattr(db, "engine", engine)
+    db.Session.configure(bind=engine)
+    monkeypatch.setattr(db, "_generation_cache", {'signature': None, 'generation': 0, 'published_at': None})
+    db.init_db()
+    yield engine
+    db.Session.configure(bind=live_engine)
+
+# Conducting bodies the sample exams cycle through
+BODIES = ("UPSC", "SSC", "IBPS", "SBI")
+
+@pytest.fixture
+def exams(database):
+    """
+    A published generation of sample exams around today: several bodies,
+    exams sharing a day, open, upcoming and closed application windows, and
+    a few undated exams
+    """
+    today = datetime.combine(date.today(), time.min)
+    exams = []
+    for i in range(40):
+        body = BODIES[i % len(BODIES)]
+        exam_date = None if i % 9 == 8 else today + timedelta(days=(i // 2) * 5 - 30)
+        exams.append({
+            'exam_name': f"{body} {'Officer' if i % 3 else 'Clerk'} Recruitment Exam {2026 + i % 2} Phase {i}",
+            'conducting_body': body,
+            'exam_date': exam_date,
+            'application_start': exam_date - timedelta(days=50) if exam_date else None,
+            'application_end': exam_date - timedelta(days=20) if exam_date else None,
+            'official_link': f"https://{body.lower()}.gov.in/notices/{i}",
+            'source_url': f"https://{body.lower()}.gov.in/notices"
+        })
+    with db.staged_ingest():
+        for exam in exams:
+            db.add_or_update_exam(exam)
+    return exams
+
+@pytest.fixture
+def client(exams, monkeypatch):
+    """A TestClient on the sample exams, with empty caches and no calendar index"""
+    from fastapi.testclient import TestClient
+    import app as webapp
+
+    # The profiler hooks the engine the app imported; follow the test database
+    webapp.query_profiler.install(db.engine)
+    webapp.response_cache.clear()
+    webapp.feed_cache.clear()
+    webapp.fragment_cache.clear()
+    monkeypatch.setattr(webapp, "calendar_index", None)
+    # Servers read the generation row once per published file, not per request
+    db.current_data_generation()
+    # Not entered as a context manager, so the startup tasks (index
+    # refresher, change watcher) don't run
+    return TestClient(webapp.app)
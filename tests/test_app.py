@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+import pytest
+
+import db
+from calendar_index import build_calendar_index
+from query_profiler import assert_query_budget
+
+def clear_caches(webapp):
+    webapp.response_cache.clear()
+    webapp.feed_cache.clear()
+    webapp.fragment_cache.clear()
+
+def range_params(days_before=30, days_after=60, body=None):
+    today = date.today()
+    start, end = today - timedelta(days=days_before), today + timedelta(days=days_after)
+    return f"start={start}&end={end}" + (f"&body={body}" if body else "")
+
+@pytest.mark.parametrize("path, budget", [
+    ("/", 3),
+    ("/exams/month/{year}/{month}", 1),
+    ("/api/stats", 1),
+    ("/api/exams/search?q=officer", 1),
+    ("/api/exams/range?{range}", 1),
+])
+def test_query_budget(client, path, budget):
+    import app as webapp
+    today = date.today()
+    path = path.format(year=today.year, month=today.month, range=range_params())
+    response = assert_query_budget(client, webapp.query_profiler, path, budget)
+    assert response.status_code == 200
+
+def follow_cursor(client, path, items, cursor_param="cursor"):
+    """Every row of a paged endpoint, one small page at a time"""
+    separator = "&" if "?" in path else "?"
+    rows, cursor = [], None
+    while True:
+        page = client.get(path + (f"{separator}{cursor_param}={cursor}" if cursor else "")).json()
+        rows += page[items]
+        if not page["has_more"]:
+            return rows
+        cursor = page["next_cursor"]
+
+@pytest.mark.parametrize("path, matches", [
+    ("/api/exams/search?days=0", lambda exam: True),
+    ("/api/exams/search?q=officer&days=0", lambda exam: "Officer" in exam["exam_name"]),
+    ("/api/exams/search?conducting_body=SSC&days=0", lambda exam: exam["conducting_body"] == "SSC"),
+    ("/api/debug/all-exams", lambda exam: True),
+])
+def test_keyset_pages_cover_every_row_once(client, exams, path, matches):
+    separator = "&" if "?" in path else "?"
+    everything = client.get(f"{path}{separator}limit=500").json()
+    assert not everything["has_more"]
+    # Undated exams (NULL dates) are paged through as well
+    assert len(everything["exams"]) == sum(map(matches, exams))
+
+    paged = follow_cursor(client, f"{path}{separator}limit=3", "exams")
+    assert paged == everything["exams"]
+
+def test_change_feed_pages(client, exams):
+    changes = follow_cursor(client, "/api/exams/changes?limit=7", "changes", cursor_param="since")
+    assert [change["seq"] for change in changes] == list(range(1, len(exams) + 1))
+    assert client.get(f"/api/exams/changes?since={changes[-1]['seq']}").json() == {
+        "changes": [], "next_cursor": changes[-1]["seq"], "has_more": False
+    }
+
+def test_calendar_index_matches_sql(client, monkeypatch):
+    import app as webapp
+    today = date.today()
+    paths = [
+        "/",
+        "/?conducting_body=UPSC",
+        f"/exams/month/{today.year}/{today.month}",
+        f"/exams/month/{today.year}/{today.month}?conducting_body=SSC",
+        f"/api/exams/range?{range_params()}",
+        f"/api/exams/range?{range_params(body='IBPS')}",
+        "/api/exams/open?fields=id,app_end&format=columns",
+        "/api/exams/open",
+        "/api/exams/open?status=upcoming",
+        "/api/exams/open?status=closed&conducting_body=SBI",
+        "/api/exams/closing-soon?within=30",
+        "/api/exams/clashes",
+        "/api/exams/clashes?gap_days=10&conducting_body=SSC",
+        "/calendar/all.ics",
+        "/calendar/upsc.ics",
+    ]
+    from_sql = {path: client.get(path) for path in paths}
+
+    session = db.Session()
+    try:
+        index = build_calendar_index(session)
+    finally:
+        session.close()
+    monkeypatch.setattr(webapp, "calendar_index", index)
+    clear_caches(webapp)
+
+    for path in paths:
+        webapp.query_profiler.last_request = None
+        response = client.get(path)
+        assert response.status_code == from_sql[path].status_code == 200, path
+        assert response.content == from_sql[path].content, path
+        # The index answered, not the database
+        assert webapp.query_profiler.last_request.count == 0, path
+
+def test_export_stream_survives_a_slow_client(database, monkeypatch):
+    import asyncio
+    import time
+    import app as webapp
+
+    # One queue slot, so the producer waits on the client for every chunk
+    monkeypatch.setattr(webapp, "EXPORT_QUEUE_SIZE", 1)
+
+    def produce(db):
+        for i in range(4):
+            yield b"chunk %d\n" % i
+
+    async def read_slowly():
+        chunks = []
+        async for chunk in webapp.stream_db(produce):
+            chunks.append(chunk)
+            if len(chunks) == 1:
+                # Longer than the producer's one-second wait on the full queue
+                await asyncio.sleep(1.3)
+        return chunks
+
+    started = time.monotonic()
+    chunks = asyncio.run(asyncio.wait_for(read_slowly(), 10))
+    assert chunks == [b"chunk %d\n" % i for i in range(4)]
+    assert time.monotonic() - started < 5
@@ -0,0 +1,120 @@
+from datetime import datetime
+
+import db
+
+def exam(name, exam_date=datetime(2030, 6, 1), **fields):
+    return {
+        'exam_name': name,
+        'conducting_body': 'SSC',
+        'exam_date': exam_date,
+        'official_link': 'https://ssc.gov.in',
+        'source_url': 'https://ssc.gov.in/notices',
+        **fields
+    }
+
+def exam_names():
+    session = db.Session()
+    try:
+        return sorted(row.exam_name for row in session.query(db.Exam))
+    finally:
+        session.close()
+
+def last_change_seq():
+    changes = db.get_exam_changes(limit=10000)
+    return changes[-1]['seq'] if changes else 0
+
+def test_rollback_publishes_a_new_generation(database):
+    with db.staged_ingest():
+        db.add_or_update_exam(exam("SSC CGL 2030"))
+    with db.staged_ingest():
+        db.add_or_update_exam(exam("SSC CHSL 2030"))
+        db.add_or_update_exam(exam("SSC MTS 2030"))
+    assert db.current_data_generation() == 2
+    discarded_seq = last_change_seq()
+
+    assert db.rollback_generation() == 3
+    assert db.current_data_generation() == 3
+    assert exam_names() == ["SSC CGL 2030"]
+
+    # The next publish and its changes don't reuse numbers handed out for the discarded data
+    with db.staged_ingest():
+        db.add_or_update_exam(exam("SSC GD 2030"))
+    assert db.current_data_generation() == 4
+    assert all(change['seq'] > discarded_seq for change in db.get_exam_changes(since=1))
+
+def sync_mirror(mirror, cursor):
+    """Apply the change log after cursor to a mirror (id -> exam), as a delta-sync client does"""
+    for change in db.get_exam_changes(since=cursor, limit=10000):
+        if change['operation'] == 'delete':
+            mirror.pop(change['exam_id'], None)
+        else:
+            mirror[change['exam_id']] = change['exam']
+        cursor = change['seq']
+    return cursor
+
+def exam_table():
+    session = db.Session()
+    try:
+        return {row.id: db.exam_to_dict(row) for row in session.query(db.Exam)}
+    finally:
+        session.close()
+
+def test_mirror_follows_a_rollback(database):
+    mirror = {}
+    with db.staged_ingest():
+        db.add_or_update_exam(exam("SSC CGL 2030"))
+    cursor = sync_mirror(mirror, 0)
+    with db.staged_ingest():
+        db.add_or_update_exam(exam("SSC CHSL 2030"))
+        db.add_or_update_exam(exam("SSC CGL 2030", official_link="https://ssc.gov.in/cgl"))
+    cursor = sync_mirror(mirror, cursor)
+    assert mirror == exam_table()
+
+    db.rollback_generation()
+    sync_mirror(mirror, cursor)
+    assert exam_names() == ["SSC CGL 2030"]
+    assert mirror == exam_table()
+
+def test_unchanged_upsert_records_no_change(database):
+    db.add_or_update_exam(exam("SSC CGL 2030"))
+    session = db.Session()
+    try:
+        updated_at = session.query(db.Exam).one().updated_at
+    finally:
+        session.close()
+    seq = last_change_seq()
+
+    db.add_or_update_exam(exam("SSC CGL 2030"))
+    assert last_change_seq() == seq
+    session = db.Session()
+    try:
+        assert session.query(db.Exam).one().updated_at == updated_at
+    finally:
+        session.close()
+
+    db.add_or_update_exam(exam("SSC CGL 2030", official_link="https://ssc.gov.in/cgl"))
+    changes = db.get_exam_changes(since=seq)
+    assert [change['operation'] for change in changes] == ['update']
+    assert changes[0]['exam']['official_link'] == "https://ssc.gov.in/cgl"
+
+def test_repeated_ingest_through_aliases_records_no_change(database):
+    from dedupe import resolve_duplicates
+
+    reports = [
+        exam("SSC CGL Tier 1 2030", official_link="https://ssc.gov.in/cgl", source_url="https://ssc.gov.in/notices"),
+        exam("SSC CGL 2030 Tier 1 Exam", application_end=datetime(2030, 4, 1),
+             official_link="https://jobs.example.org/ssc-cgl", source_url="https://jobs.example.org"),
+    ]
+    with db.staged_ingest():
+        for report in reports:
+            db.add_or_update_exam(report)
+        assert resolve_duplicates() == 1
+    table = exam_table()
+    seq = last_change_seq()
+
+    for _ in range(2):
+        with db.staged_ingest():
+            for report in reports:
+                db.add_or_update_exam(report)
+        assert last_change_seq() == seq
+        assert exam_table() == table
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from dedupe import find_duplicate_groups, is_same_exam, title_tokens
+
+def record(title, exam_date=None, conducting_body='SSC'):
+    return {'tokens': title_tokens(title), 'conducting_body': conducting_body, 'exam_date': exam_date}
+
+def test_undated_record_does_not_chain_different_dates():
+    records = {
+        1: record("SSC CGL Tier 1", datetime(2025, 9, 1)),
+        2: record("SSC CGL Tier 2", datetime(2025, 12, 1)),
+        3: record("SSC CGL Tier"),
+    }
+    assert not is_same_exam(records[1], records[2])
+
+    groups = find_duplicate_groups(records)
+    assert all(not {1, 2} <= set(group) for group in groups)
+    assert groups == [[1, 3]]
+
+def test_same_exam_from_several_sources_is_grouped():
+    records = {
+        1: record("SSC CGL 2025 Tier 1 Exam", datetime(2025, 9, 1)),
+        2: record("SSC CGL Tier 1 2025 Notification", datetime(2025, 9, 1)),
+        3: record("SSC CGL 2025 Tier 1", conducting_body='OTHER'),
+        4: record("SSC CGL 2024 Tier 1", datetime(2024, 9, 1)),
+    }
+    assert find_duplicate_groups(records) == [[1, 2, 3]]
@@ -0,0 +1,23 @@
+import asyncio
+
+from events import HEARTBEAT, Broadcaster, change_events
+
+def change(seq):
+    return {"seq": seq, "exam_id": seq, "operation": "update", "exam": None, "changed_at": "2030-01-01T00:00:00"}
+
+def test_live_changes_already_replayed_are_not_sent_again():
+    async def run():
+        broadcaster = Broadcaster()
+        subscriber = broadcaster.subscribe()
+        # Published after the client subscribed, while its replay (up to 43) was read
+        broadcaster.publish_changes([change(41), change(42)])
+        broadcaster.publish_changes([change(43), change(44), change(45)])
+        broadcaster.publish(HEARTBEAT)
+        broadcaster.publish_changes([change(46)])
+        subscriber.after_seq = 43
+
+        messages = broadcaster.messages(subscriber)
+        return await asyncio.wait_for(messages.__anext__(), 1)
+
+    sent = asyncio.run(run())
+    assert sent == change_events([change(44), change(45)]) + HEARTBEAT + change_events([change(46)])
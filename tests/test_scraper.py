@@ -0,0 +1,93 @@
+import io
+from datetime import datetime
+
+import pytest
+import requests
+
+@pytest.fixture
+def scraper_class(tmp_path, monkeypatch):
+    # scraper.base logs to scraper.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    from scraper.base import BaseScraper
+
+    class FakeScraper(BaseScraper):
+        feed_url = "https://example.org/feed"
+
+        def __init__(self, entries, pages):
+            super().__init__("https://example.org/")
+            self.entries = entries
+            # url -> exam dict, None (not an exam) or an exception to raise
+            self.pages = pages
+
+        def scrape(self):
+            return []
+
+        def iter_feed(self, url):
+            yield from self.entries
+
+        def get_soup(self, url):
+            page = self.pages[url]
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        def parse_detail(self, page, url, title):
+            return page and {**page, "source_url": self.base_url}
+
+    return FakeScraper
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+def entry(guid):
+    return {"guid": guid, "link": f"https://example.org/{guid}", "title": f"SSC notification {guid}", "published": None}
+
+def test_failed_feed_entries_stay_unseen(scraper_class):
+    pages = {
+        "https://example.org/ok": {"exam_name": "SSC CGL 2030"},
+        "https://example.org/other": None,
+        "https://example.org/gone": http_error(404),
+        "https://example.org/down": http_error(503),
+        "https://example.org/broken": ValueError("no table"),
+    }
+    scraper = scraper_class([entry(guid) for guid in ("ok", "other", "gone", "down", "broken")], pages)
+
+    exams = scraper.scrape_incremental(datetime(2030, 1, 1), set())
+    # The same source_url as the listing crawl, not the feed's URL
+    assert exams == [{"exam_name": "SSC CGL 2030", "source_url": "https://example.org/"}]
+    assert scraper.new_feed_guids == ["ok", "other", "gone"]
+    assert scraper.failed_urls == ["https://example.org/down", "https://example.org/broken"]
+
+class FakeResponse:
+    def __init__(self, body):
+        self.raw = io.BytesIO(body)
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_sitemap_ignores_extension_locs(scraper_class):
+    sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://example.org/ssc-cgl-2030</loc>
+    <lastmod>2030-01-02T10:00:00</lastmod>
+    <image:image><image:loc>https://example.org/banner.png</image:loc></image:image>
+  </url>
+  <url>
+    <image:image><image:loc>https://example.org/logo.png</image:loc></image:image>
+    <loc>https://example.org/ssc-chsl-2030</loc>
+  </url>
+</urlset>"""
+    scraper = scraper_class([], {})
+    scraper.session.get = lambda url, **kwargs: FakeResponse(sitemap)
+
+    assert list(scraper.iter_sitemap("https://example.org/sitemap.xml")) == [
+        ("https://example.org/ssc-cgl-2030", datetime(2030, 1, 2, 10)),
+        ("https://example.org/ssc-chsl-2030", None),
+    ]
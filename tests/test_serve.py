@@ -0,0 +1,47 @@
+import itertools
+
+import pytest
+
+@pytest.fixture
+def supervisor(database, monkeypatch):
+    # serve imports the app, which expects static/ and templates/ in the working directory
+    import serve
+
+    clock = [1000.0]
+    pids = itertools.count(100)
+    monkeypatch.setattr(serve.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(serve, "spawn_worker", lambda sock, log_level: next(pids))
+    supervisor = serve.Supervisor(None, 2, "info")
+    supervisor.clock = clock
+    return supervisor
+
+def exit_worker(supervisor, pid):
+    supervisor.pids.discard(pid)
+    supervisor.schedule_restart(pid, 256, supervisor.started.pop(pid))
+
+def test_workers_dying_at_startup_are_restarted_with_backoff(supervisor):
+    import serve
+    supervisor.spawn(2)
+    delays = []
+    for _ in range(10):
+        # The newest worker dies young each time
+        pid = max(supervisor.pids)
+        supervisor.clock[0] += 0.1
+        exit_worker(supervisor, pid)
+        delays.append(supervisor.restart_delay)
+
+        supervisor.start_due_restarts()
+        assert len(supervisor.pids) == 1
+        supervisor.clock[0] += supervisor.restart_delay
+        supervisor.start_due_restarts()
+        assert len(supervisor.pids) == 2
+
+    assert delays == [0.5, 1, 2, 4, 8, 16, 30, 30, 30, 30]
+
+    # A worker that ran for a while (the first one) is replaced at once
+    pid = min(supervisor.pids)
+    supervisor.clock[0] += serve.STABLE_WORKER_SECONDS
+    exit_worker(supervisor, pid)
+    supervisor.start_due_restarts()
+    assert supervisor.restart_delay == 0
+    assert len(supervisor.pids) == 2